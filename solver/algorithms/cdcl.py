@@ -0,0 +1,268 @@
+from solver.propagation import WatchedPropagator
+from solver.vsids import VSIDS
+from solver.restarts import luby
+
+
+def analyze(propagator, conflict, seen, bump):
+    """
+    First-UIP conflict analysis.
+    Returns the learned clause (asserting literal first, a literal of the
+    backjump level second) and the backjump level.
+    """
+    clauses = propagator.clauses
+    levels = propagator.levels
+    reasons = propagator.reasons
+    trail = propagator.trail
+    level = propagator.decision_level
+
+    learnt = [None]
+    pending = 0
+    literal = None
+    index = len(trail) - 1
+    clause = clauses[conflict]
+    while True:
+        for q in clause:
+            var = abs(q)
+            if q == literal or seen[var] or levels[var] == 0:
+                continue
+            seen[var] = True
+            bump(var)
+            if levels[var] == level:
+                pending += 1
+            else:
+                learnt.append(q)
+        while not seen[abs(trail[index])]:
+            index -= 1
+        literal = trail[index]
+        index -= 1
+        seen[abs(literal)] = False
+        pending -= 1
+        if pending == 0:
+            break
+        clause = clauses[reasons[abs(literal)]]
+    learnt[0] = -literal
+
+    # Drop literals implied by the rest of the clause through their reason
+    kept = [learnt[0]]
+    for q in learnt[1:]:
+        reason = reasons[abs(q)]
+        if reason is None or any(not seen[abs(r)] and levels[abs(r)] > 0
+                                 for r in clauses[reason] if r != -q):
+            kept.append(q)
+    for q in learnt[1:]:
+        seen[abs(q)] = False
+    learnt = kept
+
+    if len(learnt) == 1:
+        return learnt, 0
+    best = max(range(1, len(learnt)), key=lambda i: levels[abs(learnt[i])])
+    learnt[1], learnt[best] = learnt[best], learnt[1]
+    return learnt, levels[abs(learnt[1])]
+
+
+class Solver:
+    """
+    Incremental conflict-driven clause learning SAT solver.
+    Accepts clauses in DIMACS-style format (list of sets of integers).
+
+    Conflicts are analysed to the first unique implication point, the learned
+    clause is added to the database and the search backjumps to the second
+    highest level in that clause. Learned clauses are periodically reduced by
+    their literal block distance (LBD), keeping glue clauses (LBD <= 2) and
+    clauses that are currently reasons. Restarts follow the Luby sequence and
+    decisions come from the VSIDS activity heap with phase saving.
+
+    The clause database, watches, learned clauses and heuristic state are kept
+    between calls to `solve`, so related queries on the same formula reuse the
+    work of earlier ones. `add_clause` may add clauses over new variables
+    between queries. Assumptions are decided first, one per decision level;
+    after an unsatisfiable query `core` holds the assumptions that the formula
+    refutes, which is empty if it is unsatisfiable without them. After a
+    satisfiable one `model` holds one literal per variable.
+
+    `counts` accumulates decisions, conflicts, propagations, restarts, learned
+    and deleted clause counts over every query.
+    """
+
+    def __init__(self, clauses=(), verbose=False, restart_base=100, reduce_base=2000, decay=0.95):
+        self.propagator = WatchedPropagator(clauses)
+        self.heuristic = VSIDS(self.propagator, decay)
+        self.verbose = verbose
+        self.restart_base = restart_base
+        self.reduce_base = reduce_base
+        self.seen = [False] * (self.propagator.num_vars + 1)
+        self.learnts = {}  # clause index -> LBD
+        self.counts = dict(decisions=0, conflicts=0, propagations=0, restarts=0, learned=0, deleted=0)
+        self.restart_count = 1
+        self.next_reduce = reduce_base
+        self.model = None
+        self.core = None
+
+    def add_variables(self, num_vars):
+        self.propagator.add_variables(num_vars)
+        self.heuristic.add_variables(num_vars)
+        self.seen.extend([False] * (num_vars + 1 - len(self.seen)))
+
+    def add_clause(self, clause):
+        """
+        Add a clause to the formula. Literals False at the root are dropped and
+        clauses True at the root or tautological are skipped.
+        """
+        clause = list(dict.fromkeys(clause))
+        if any(-lit in clause for lit in clause):
+            return
+        self.add_variables(max((abs(lit) for lit in clause), default=0))
+        propagator = self.propagator
+        remaining = []
+        for lit in clause:
+            value = propagator.value(lit)
+            if value > 0:
+                return
+            if not value:
+                remaining.append(lit)
+        propagator.add_clause(remaining)
+
+    def backjump(self, level):
+        propagator = self.propagator
+        if level < propagator.decision_level:
+            self.heuristic.unassign(propagator.trail[propagator.trail_lim[level]:])
+            propagator.backtrack(level)
+
+    def analyze_final(self, literal):
+        """
+        Return the assumptions that imply the True `literal`, together with the
+        assumption -literal it falsifies.
+        """
+        propagator = self.propagator
+        levels, reasons, clauses, seen = propagator.levels, propagator.reasons, propagator.clauses, self.seen
+        core = [-literal]
+        if levels[abs(literal)] == 0:
+            return core
+        seen[abs(literal)] = True
+        for lit in reversed(propagator.trail[propagator.trail_lim[0]:]):
+            var = abs(lit)
+            if not seen[var]:
+                continue
+            reason = reasons[var]
+            if reason is None:
+                # Decisions below the assumption levels are assumptions
+                core.append(lit)
+            else:
+                for q in clauses[reason]:
+                    if levels[abs(q)] > 0:
+                        seen[abs(q)] = True
+            seen[var] = False
+        return core
+
+    def finish(self, result):
+        if self.verbose:
+            print(f"Result: {'SATISFIABLE' if result else 'UNSATISFIABLE'}")
+        self.backjump(0)
+        return result
+
+    def solve(self, assumptions=()):
+        """
+        Decide the formula under the assumption literals. Returns True or False.
+        """
+        propagator = self.propagator
+        heuristic = self.heuristic
+        counts = self.counts
+        learnts = self.learnts
+        assumptions = list(assumptions)
+        self.add_variables(max((abs(lit) for lit in assumptions), default=0))
+        levels = propagator.levels
+        reasons = propagator.reasons
+        trail = propagator.trail
+        verbose = self.verbose
+        self.model = self.core = None
+        restart_limit = self.restart_base * luby(self.restart_count)
+        conflicts_since_restart = 0
+
+        while True:
+            start = len(trail)
+            conflict = propagator.propagate()
+            counts["propagations"] += len(trail) - start
+            if conflict is not None:
+                counts["conflicts"] += 1
+                conflicts_since_restart += 1
+                if propagator.decision_level == 0:
+                    self.core = []
+                    return self.finish(False)
+                learnt, level = analyze(propagator, conflict, self.seen, heuristic.bump)
+                heuristic.decay_activities()
+                if verbose:
+                    print(f"{'  ' * propagator.decision_level}Conflict in clause {conflict}, "
+                          f"learned {set(learnt)}, backjumping to level {level}")
+                self.backjump(level)
+                index = propagator.add_clause(learnt)
+                if len(learnt) > 1:
+                    learnts[index] = len({levels[abs(q)] for q in learnt[1:]}) + 1
+                    propagator.assign(learnt[0], index)
+                counts["learned"] += 1
+                continue
+
+            if conflicts_since_restart >= restart_limit:
+                self.restart_count += 1
+                restart_limit = self.restart_base * luby(self.restart_count)
+                conflicts_since_restart = 0
+                counts["restarts"] += 1
+                self.backjump(0)
+                if verbose:
+                    print("Restarting")
+                continue
+
+            if counts["conflicts"] >= self.next_reduce:
+                self.next_reduce = counts["conflicts"] + self.reduce_base
+                locked = {reasons[abs(propagator.clauses[i][0])] for i in learnts}
+                candidates = sorted((i for i, lbd in learnts.items() if lbd > 2 and i not in locked),
+                                    key=lambda i: -learnts[i])
+                removed = set(candidates[:len(candidates) // 2])
+                if removed:
+                    propagator.remove_clauses(removed)
+                    for i in removed:
+                        del learnts[i]
+                    counts["deleted"] += len(removed)
+
+            literal = None
+            while literal is None and propagator.decision_level < len(assumptions):
+                assumption = assumptions[propagator.decision_level]
+                value = propagator.value(assumption)
+                if value > 0:
+                    # Already implied: open an empty level to keep one level per assumption
+                    propagator.new_level()
+                elif value < 0:
+                    self.core = self.analyze_final(-assumption)
+                    if verbose:
+                        print(f"Assumption {assumption} is refuted, core {self.core}")
+                    return self.finish(False)
+                else:
+                    literal = assumption
+            if literal is None:
+                literal = heuristic.select()
+                if literal is None:
+                    values = propagator.values
+                    self.model = [var if values[var] > 0 else -var for var in range(1, propagator.num_vars + 1)]
+                    return self.finish(True)
+            counts["decisions"] += 1
+            if verbose:
+                print(f"{'  ' * propagator.decision_level}Deciding {literal}")
+            propagator.new_level()
+            propagator.assign(literal)
+
+
+def cdcl(clauses, verbose=True, stats=None, restart_base=100, reduce_base=2000, decay=0.95):
+    """
+    Conflict-driven clause learning SAT solver, a single query on a `Solver`.
+
+    Returns (result, splits) like `dpll`, where splits counts decisions. If a
+    dict is passed as `stats` it is filled with decisions, conflicts,
+    propagations, restarts, learned and deleted clause counts, and with the
+    model under "model" if one was found.
+    """
+    solver = Solver(clauses, verbose=verbose, restart_base=restart_base, reduce_base=reduce_base, decay=decay)
+    result = solver.solve()
+    if stats is not None:
+        stats.update(solver.counts)
+        if solver.model is not None:
+            stats["model"] = solver.model
+    return result, solver.counts["decisions"]
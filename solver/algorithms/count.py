@@ -0,0 +1,200 @@
+import sys
+import hashlib
+from array import array
+from collections import OrderedDict
+from solver.clausedb import ClauseDB
+from solver.propagation import WatchedPropagator
+from solver.branch_heuristics import select_literal
+from solver.components import split_components, component_variables
+from solver.stats import SearchStats
+
+
+class ComponentCache:
+    """
+    LRU cache of component model counts, capped at about `max_bytes`.
+
+    A component is keyed by a 16-byte BLAKE2 digest of its canonical form: the
+    sorted list of its sorted clauses. The same sub-formula over the same
+    variables gets the same key wherever it shows up in the search. The size
+    of an entry is estimated from its key, its count and a fixed overhead for
+    the dict slot; the least recently used entries are evicted once the total
+    exceeds the cap.
+    """
+
+    ENTRY_OVERHEAD = 100
+
+    def __init__(self, max_bytes=64 << 20):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    @staticmethod
+    def key(component):
+        data = array("i")
+        for clause in sorted(sorted(clause) for clause in component):
+            data.extend(clause)
+            data.append(0)
+        return hashlib.blake2b(data.tobytes(), digest_size=16).digest()
+
+    def get(self, key):
+        count = self.entries.get(key)
+        if count is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return count
+
+    def put(self, key, count):
+        size = self.ENTRY_OVERHEAD + sys.getsizeof(key) + sys.getsizeof(count)
+        if key in self.entries or size > self.max_bytes:
+            return
+        self.entries[key] = count
+        self.bytes += size
+        while self.bytes > self.max_bytes:
+            old_key, old_count = self.entries.popitem(last=False)
+            self.bytes -= self.ENTRY_OVERHEAD + sys.getsizeof(old_key) + sys.getsizeof(old_count)
+            self.evictions += 1
+
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class ModelCounter:
+    """
+    Exact model counter (#SAT) on top of the DPLL branching heuristics and
+    the watched-literal unit propagation.
+
+    The formula is split into variable-disjoint components and the count is
+    the product of the component counts times 2 ** (free variables). A
+    component branches on a literal chosen by `select_literal` with `method`,
+    propagates each polarity on its own `WatchedPropagator`, and counts the
+    residual formula of each branch the same way. Component counts are kept
+    in a `ComponentCache`, so a sub-formula reached again through different
+    partial assignments is counted once. Counts are Python ints and exact.
+    The search runs on an explicit stack, so deep formulas are not limited by
+    the recursion limit.
+    """
+
+    def __init__(self, method="JW", cache_bytes=64 << 20, stats=None):
+        self.method = method
+        self.cache = ComponentCache(cache_bytes)
+        self.stats = stats if stats is not None else SearchStats()
+
+    def count(self, clauses, num_vars=None):
+        """
+        Return the number of assignments of variables 1..num_vars that satisfy
+        the clauses. num_vars defaults to the largest variable in the clauses.
+        """
+        if isinstance(clauses, ClauseDB):
+            clauses = clauses.clause_lists()
+        formula = []
+        for clause in clauses:
+            clause = list(dict.fromkeys(clause))
+            # Tautologies constrain nothing: their variables may stay free
+            if not any(-l in clause for l in clause):
+                formula.append(clause)
+        if any(not clause for clause in formula):
+            return 0
+        propagator = WatchedPropagator(formula)
+        if num_vars is None:
+            num_vars = propagator.num_vars
+        if propagator.propagate() is not None:
+            return 0
+        self.stats.propagations += len(propagator.trail)
+        residual = list(propagator.residual_clauses())
+        num_vars = max(num_vars, propagator.num_vars)
+        return self._run(self._count_formula(residual, num_vars - len(propagator.trail), 0))
+
+    @staticmethod
+    def _run(task):
+        """
+        Drive the counting generators on an explicit stack. A generator yields
+        the generator of a sub-count, is resumed with its result and returns
+        its own count, so the search depth does not use Python frames.
+        """
+        stack = [task]
+        result = None
+        while stack:
+            try:
+                subtask = stack[-1].send(result)
+            except StopIteration as done:
+                stack.pop()
+                result = done.value
+                continue
+            stack.append(subtask)
+            result = None
+        return result
+
+    def _count_formula(self, residual, num_vars, depth):
+        # Models over num_vars unassigned variables, of which the ones outside residual are free
+        stats = self.stats
+        stats.tick()
+        parts = split_components(residual)
+        if len(parts) > 1:
+            stats.decompositions += 1
+            stats.event("decompose", components=len(parts), depth=depth)
+        total = 1
+        for i, part in enumerate(parts):
+            variables = component_variables(part)
+            num_vars -= len(variables)
+            stats.components += 1
+            count = yield self._count_component(part, len(variables), depth)
+            if not count:
+                stats.skipped_components += len(parts) - i - 1
+                return 0
+            total *= count
+        return total << num_vars
+
+    def _count_component(self, component, num_vars, depth):
+        cache, stats = self.cache, self.stats
+        key = cache.key(component)
+        count = cache.get(key)
+        if count is not None:
+            return count
+        propagator = WatchedPropagator(component)
+        literal = select_literal(component, "", False, method=self.method)
+        stats.max_depth = max(stats.max_depth, depth + 1)
+        count = 0
+        for branch in (literal, -literal):
+            stats.decisions += 1
+            stats.event("decision", literal=branch, depth=depth)
+            propagator.new_level()
+            propagator.assign(branch)
+            conflict = propagator.propagate()
+            stats.propagations += len(propagator.trail)
+            if conflict is None:
+                residual = list(propagator.residual_clauses())
+                count += yield self._count_formula(residual, num_vars - len(propagator.trail), depth + 1)
+            else:
+                stats.conflicts += 1
+                stats.event("conflict", clause=conflict, depth=depth)
+            propagator.backtrack(0)
+        cache.put(key, count)
+        return count
+
+
+def count_models(clauses, method="JW", num_vars=None, cache_bytes=64 << 20, verbose=True, stats=None):
+    """
+    Count the models of the formula with a `ModelCounter`. Returns
+    (count, decisions). A `SearchStats` passed as `stats` receives the search
+    counters and the cache hits, misses and evictions.
+    """
+    if stats is None:
+        stats = SearchStats()
+    counter = ModelCounter(method, cache_bytes, stats)
+    count = counter.count(clauses, num_vars)
+    cache = counter.cache
+    stats.cache_hits, stats.cache_misses, stats.cache_evictions = cache.hits, cache.misses, cache.evictions
+    if verbose:
+        print(f"Models: {count}")
+        print(f"Component cache: {cache.hits} hits, {cache.misses} misses ({cache.hit_rate():.1%}), "
+              f"{cache.evictions} evictions, {len(cache)} entries")
+    return stats.finish(count), stats.decisions
@@ -0,0 +1,158 @@
+import math
+import multiprocessing
+import os
+import queue
+from multiprocessing.shared_memory import SharedMemory
+from solver.clausedb import ClauseDB
+from solver.propagation import WatchedPropagator
+from solver.branch_heuristics import select_literal
+from solver.stats import SearchStats
+from solver.algorithms.dpll import dpll
+
+
+def make_cubes(clauses, depth, method="JW", verbose=True):
+    """
+    Split the formula into cubes of up to `depth` decision literals.
+
+    The cube tree is explored depth first on a `WatchedPropagator`. Branching
+    literals come from `select_literal` on the residual formula, cubes refuted
+    by unit propagation are dropped and a cube whose propagation satisfies the
+    formula ends the cubing phase.
+    Returns (result, cubes, splits) where result is True if a cube satisfied
+    the formula, False if every cube was refuted and None otherwise.
+    """
+    propagator = WatchedPropagator(clauses)
+    splits = 0
+    if propagator.propagate() is not None:
+        return False, [], splits
+    cubes = []
+    stack = [[]]
+    while stack:
+        cube = stack.pop()
+        propagator.backtrack(0)
+        propagator.new_level()
+        if not all(propagator.assign(l) and propagator.propagate() is None for l in cube):
+            if verbose:
+                print(f"Cube {cube} refuted by unit propagation")
+            continue
+        residual = list(propagator.residual_clauses())
+        if not residual:
+            if verbose:
+                print(f"Cube {cube} satisfies the formula")
+            return True, [cube], splits
+        if len(cube) >= depth:
+            cubes.append(cube)
+            continue
+        literal = select_literal(residual, "", False, method=method)
+        splits += 1
+        stack.append(cube + [-literal])
+        stack.append(cube + [literal])
+    return (None if cubes else False), cubes, splits
+
+
+def conquer(shared, method, tasks, results):
+    """
+    Worker loop: take cubes from `tasks` until a None sentinel, solve each one
+    with `dpll` under the cube as assumptions and put (cube, result, splits,
+    model) on `results`. A failing worker puts (None, None, error message,
+    None) instead.
+    """
+    shm = SharedMemory(name=shared[0])
+    clauses = ClauseDB.from_buffer(shm.buf, *shared[1:])
+    try:
+        for cube in iter(tasks.get, None):
+            search = SearchStats()
+            result, splits = dpll(clauses, verbose=False, method=method, assumptions=cube, stats=search)
+            results.put((cube, result, splits, search.model))
+    except Exception as e:
+        results.put((None, None, repr(e), None))
+    finally:
+        # The views into the block must be released before it can be closed
+        clauses = None
+        shm.close()
+
+
+def cube_and_conquer(clauses, method="JW", workers=None, depth=None, verbose=True, stats=None):
+    """
+    Cube-and-conquer parallel DPLL.
+
+    The formula is first split into cubes with `make_cubes`, by default into
+    about 8 cubes per worker. Worker processes read the instance from shared
+    memory and take cubes from one shared cube queue, so a worker that
+    finishes early takes the next cube instead of idling. Cubes are never
+    split or taken over once a worker started them: a hard cube is solved by
+    its worker alone, and a deeper `depth` spreads hard regions over more
+    cubes. The search stops as soon as a cube is satisfiable; the formula is
+    unsatisfiable once every cube is refuted.
+
+    Returns (result, splits), where splits adds the cubing decisions to the
+    splits of every solved cube. If a dict is passed as `stats` it is filled
+    with the number of cubes and of cubes solved by the workers, and with the
+    model under "model" if the formula is satisfiable.
+    """
+    workers = workers or os.cpu_count() or 1
+    if depth is None:
+        depth = max(1, math.ceil(math.log2(8 * workers)))
+    if not isinstance(clauses, ClauseDB):
+        clauses = ClauseDB(clauses)
+
+    def finish(result, splits, solved=0, model=None):
+        if stats is not None:
+            stats.update(cubes=len(cubes), solved_cubes=solved)
+            if model is not None:
+                stats["model"] = model
+        if verbose:
+            print(f"Result: {'SATISFIABLE' if result else 'UNSATISFIABLE'}")
+        return result, splits
+
+    result, cubes, splits = make_cubes(clauses, depth, method=method, verbose=verbose)
+    if verbose:
+        print(f"Cubing: {len(cubes)} cubes of depth {depth} after {splits} splits")
+    if result and stats is not None:
+        # Propagating the satisfying cube again yields its model
+        search = SearchStats()
+        dpll(clauses, verbose=False, method=method, assumptions=cubes[0], stats=search)
+        return finish(result, splits, model=search.model)
+    if result is not None:
+        return finish(result, splits)
+
+    shm, shared = clauses.share()
+    context = multiprocessing.get_context()
+    tasks = context.Queue()
+    results = context.Queue()
+    for cube in cubes:
+        tasks.put(cube)
+    processes = [context.Process(target=conquer, args=(shared, method, tasks, results), daemon=True)
+                 for _ in range(min(workers, len(cubes)))]
+    for _ in processes:
+        tasks.put(None)
+    try:
+        for process in processes:
+            process.start()
+        solved = 0
+        while solved < len(cubes):
+            try:
+                cube, result, cube_splits, model = results.get(timeout=0.1)
+            except queue.Empty:
+                if any(process.is_alive() for process in processes) or not results.empty():
+                    continue
+                raise RuntimeError("Every cube-and-conquer worker stopped before all cubes were solved")
+            if result is None:
+                raise RuntimeError(f"Cube-and-conquer worker failed: {cube_splits}")
+            solved += 1
+            splits += cube_splits
+            if verbose:
+                print(f"Cube {cube}: {'SATISFIABLE' if result else 'refuted'} after {cube_splits} splits")
+            if result:
+                return finish(True, splits, solved, model)
+        return finish(False, splits, solved)
+    finally:
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+        for process in processes:
+            process.join()
+        tasks.close()
+        results.close()
+        shm.close()
+        shm.unlink()
@@ -0,0 +1,91 @@
+import multiprocessing
+from solver.components import component_variables
+
+# Entries of the component statistics that are not summed over the components
+SKIPPED_STATS = ("model", "result", "winner", "max_depth")
+
+
+def solve_component(job):
+    """
+    Pool task: solve one component with `solve` and return
+    (index, result, splits, stats).
+    """
+    index, solve, component, options = job
+    stats = {}
+    result = solve(component, stats=stats, **options)
+    splits = 0
+    if isinstance(result, tuple):
+        result, splits = result
+    return index, result, splits, stats
+
+
+def solve_components(parts, solve, options, workers=None, verbose=True, stats=None):
+    """
+    Solve the variable-disjoint components `parts` of a formula one at a time
+    with solve(component, stats=..., **options), or on a pool of `workers`
+    processes when more than one is requested.
+
+    The formula is unsatisfiable as soon as one component is, and the
+    remaining components are skipped. It is satisfiable when every component
+    is, and the model merges the component models. If a component is
+    undecided (local search out of flips) and none is unsatisfiable the
+    result is None. Returns (result, splits) where splits adds up the splits
+    of the solved components.
+
+    If a dict is passed as `stats` it receives the sum of the numeric
+    component statistics, the largest max_depth, the number of components,
+    how many were solved and skipped, and the merged model under "model" if
+    every component returned one.
+    """
+    parts = [[set(clause) for clause in part] for part in parts]
+    num_vars = max((abs(lit) for part in parts for clause in part for lit in clause), default=0)
+    # Variables without clauses take any value
+    model = list(range(1, num_vars + 1))
+    totals = {}
+    result, splits, solved = True, 0, 0
+    complete = True  # dp and resolution prove satisfiability without a model
+    jobs = ((index, solve, part, options) for index, part in enumerate(parts))
+    pool = None
+    if workers and workers > 1 and len(parts) > 1:
+        pool = multiprocessing.get_context().Pool(min(workers, len(parts)))
+        results = pool.imap_unordered(solve_component, jobs)
+    else:
+        results = map(solve_component, jobs)
+    try:
+        for index, part_result, part_splits, part_stats in results:
+            solved += 1
+            splits += part_splits
+            for key, value in part_stats.items():
+                if isinstance(value, (int, float)) and not isinstance(value, bool) and key not in SKIPPED_STATS:
+                    totals[key] = totals.get(key, 0) + value
+            totals["max_depth"] = max(totals.get("max_depth", 0), part_stats.get("max_depth", 0))
+            if verbose:
+                status = {True: "satisfiable", False: "unsatisfiable", None: "undecided"}[part_result]
+                print(f"Component {index + 1}/{len(parts)} ({len(parts[index])} clauses): {status}")
+            if part_result is False:
+                result = False
+                break
+            if part_result is None:
+                result = None
+                continue
+            if part_stats.get("model") is None:
+                complete = False
+                continue
+            variables = component_variables(parts[index])
+            for lit in part_stats["model"]:
+                if abs(lit) in variables:
+                    model[abs(lit) - 1] = lit
+    finally:
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+    if verbose:
+        print(f"Result: {'SATISFIABLE' if result else ('UNKNOWN' if result is None else 'UNSATISFIABLE')}")
+    if stats is not None:
+        stats.update(totals)
+        stats["decompositions"] = totals.get("decompositions", 0) + 1
+        stats["components"] = totals.get("components", 0) + solved
+        stats["skipped_components"] = totals.get("skipped_components", 0) + len(parts) - solved
+        if result and complete:
+            stats["model"] = model
+    return result, splits
@@ -1,81 +1,308 @@
-from solver.utils import unit_propagation, pure_literal_elimination
+import time
+from solver.propagation import WatchedPropagator
 from solver.branch_heuristics import select_literal
+from solver.vsids import VSIDS
+from solver.occurrences import OccurrenceIndex
+from solver.lookahead import Lookahead
+from solver.restarts import make_restart_policy
+from solver.stats import SearchStats
+from solver.components import split_components, component_variables
+from solver.cardinality import CardinalityPropagator
 
-def dpll(clauses, branch=None, indent=0, verbose=True, method="first", splits = 0):
+def dpll(clauses, verbose=True, method="first", splits=0, assumptions=(), restarts=None, restart_base=100,
+         phase_saving=False, phases=None, decompose=False, cardinality=(), stats=None,
+         lookahead_candidates=Lookahead.MAX_CANDIDATES):
     """
     DPLL algorithm for SAT solving.
     Accepts clauses in DIMACS-style format (list of sets of integers).
+
+    The search is iterative: every decision opens a new level on the propagator
+    trail and backtracking undoes that trail in place, so the clause database is
+    never copied and the search depth is not bounded by the recursion limit.
+    Returns (result, splits).
+
+    With method="VSIDS" the residual formula is never rebuilt: the variables of
+    every conflicting clause are bumped, decisions come from the activity heap
+    and the formula is satisfied once every variable is assigned.
+
+    MAXO, MOMS, MAMS and JW keep an `OccurrenceIndex` in sync with the trail and
+    use it for pure literal detection and literal selection, which gives the same
+    decisions as rescanning the residual formula at every node.
+
+    UP, GUP and SUP use a `Lookahead` that probes candidates on the propagator
+    trail, UP and GUP at most `lookahead_candidates` of them (None probes
+    every literal). When it asserts failed literals the node is propagated
+    and simplified again before branching.
+
+    Literals in `assumptions` are added as unit clauses, so the search is
+    restricted to the assignments that make all of them True.
+
+    `restarts` names a policy from `solver.restarts` ("luby", "geometric" or
+    "glucose") that counts every refuted node and may send the search back to
+    level 0, with `restart_base` conflicts as its initial budget. With
+    `phase_saving` a decision takes the value its variable had when it was last
+    unassigned, whichever literal the branching method picked. Literals in
+    `phases` seed the saved phases and turn phase saving on.
+
+    Before a restart the refuted part of the search is recorded as nogood
+    clauses on the propagator: the negated decisions of the current node and,
+    for every decision whose True branch was refuted, its negated prefix and
+    its literal. They are implied by the formula, so the search stays
+    complete, and propagating them keeps the next descent out of the refuted
+    subtrees instead of repeating the same decisions.
+
+    With `decompose` every node checks whether the residual formula falls
+    apart into variable-disjoint components. If it does, each component is
+    solved by its own `dpll` call, smallest first: the node is satisfiable
+    when all of them are and refuted as soon as one is not, so the remaining
+    components are skipped instead of being searched again under every
+    assignment of the others. VSIDS never builds the residual formula and
+    does not decompose.
+
+    `cardinality` holds (literals, k) constraints meaning at most k of the
+    literals are True. They are propagated natively by a
+    `CardinalityPropagator` instead of being expanded into clauses. Literals
+    in a constraint are never assigned as pure literals. The search also
+    assigns the constraint literals that no clause fixes, and it does not
+    decompose, because components only follow the clauses.
+
+    If a `SearchStats` is passed as `stats` it receives the decision,
+    propagation, conflict, backtrack and restart counts, the maximum depth,
+    the time spent in propagation, simplification and the heuristic, and
+    every search event.
     """
-    indentation = "  " * indent
-    # 1. Unit Propagation
-    clauses, counter = unit_propagation(clauses, indentation, verbose)
-    if clauses is False:
-        if verbose:
-            msg = f"{indentation}Unsatisfiable after unit propagation"
-            if branch is not None:
-                msg += f" for branch {branch}"
-            print(msg)
-        if indent == 0 and verbose:
-            print("Result: UNSATISFIABLE")
-        return False, splits
-    elif not clauses:
-        if verbose:
-            msg = f"{indentation}Satisfiable after unit propagation"
-            if branch is not None:
-                msg += f" for branch {branch}"
-            print(msg)
-        if indent == 0 and verbose:
-            print("Result: SATISFIABLE")
-        return True, splits
-
-    # 2. Pure Literal Elimination
-    clauses = pure_literal_elimination(clauses, indentation, verbose)
-    if not clauses:
-        if verbose:
-            msg = f"{indentation}Satisfiable after pure literal elimination"
-            if branch is not None:
-                msg += f" for branch {branch}"
-            print(msg)
-        if indent == 0 and verbose:
-            print("Result: SATISFIABLE")
-        return True, splits
-
-    # 3. Choose a branching literal
-    literal = select_literal(clauses, indentation, verbose, method=method)
-    if literal is None:
-        # No literal selected, backtrack
-        if verbose:
-            print(f"{indentation}No literal could be selected, backtracking")
-        return False, splits
-    splits += 1
-
-    # 4. Try literal = True
-    if verbose:
-        print(f"\n{indentation}Branching on {literal} = True")
-    new_clauses_true = clauses + [frozenset([literal])]
-    result, splits = dpll(new_clauses_true, literal, indent + 1, verbose, method, splits)
-    if result:
-        if verbose:
-            print(f"{indentation}Satisfiable with {literal} = True")
-        if indent == 0 and verbose:
-            print("Result: SATISFIABLE")
-        return True, splits
-
-    # 5. Try literal = False
-    if verbose:
-        print(f"\n{indentation}Branching on {literal} = False")
-    new_clauses_false = clauses + [frozenset([-literal])]
-    result, splits = dpll(new_clauses_false, -literal, indent + 1, verbose, method, splits)
-    if result:
+    if cardinality:
+        propagator = CardinalityPropagator(clauses, cardinality)
+        # Setting one of these True could exceed a bound, so they are never pure
+        constrained = {lit for literals, _ in cardinality for lit in literals}
+        decompose = False
+    else:
+        propagator = WatchedPropagator(clauses)
+        constrained = ()
+    for literal in assumptions:
+        propagator.add_clause([literal])
+    heuristic = None
+    if method == "VSIDS":
+        heuristic = VSIDS(propagator)
+    elif method in OccurrenceIndex.METHODS:
+        heuristic = OccurrenceIndex(propagator)
+    elif method in Lookahead.METHODS:
+        heuristic = Lookahead(propagator, lookahead_candidates)
+    policy = make_restart_policy(restarts, restart_base) if restarts else None
+    phase = [0] * (propagator.num_vars + 1) if phase_saving or phases else None
+    for lit in phases or ():
+        if abs(lit) <= propagator.num_vars:
+            phase[abs(lit)] = lit
+    decisions = []  # (literal, flipped) for every open decision level
+    if stats is None:
+        stats = SearchStats()
+    clock = time.perf_counter
+
+    def decide(literal):
+        stats.decisions += 1
+        stats.max_depth = max(stats.max_depth, len(decisions))
+        stats.event("decision", literal=literal, depth=len(decisions))
+        propagator.new_level()
+        propagator.assign(literal)
+
+    def solve_components(parts):
+        # The components only share the current assignment, which every call keeps
+        nonlocal splits
+        stats.decompositions += 1
+        stats.event("decompose", components=len(parts), depth=len(decisions))
+        values = propagator.values
+        model = [v if values[v] > 0 else -v for v in range(1, propagator.num_vars + 1)]
+        for i, part in enumerate(parts):
+            search = SearchStats()
+            result, part_splits = dpll(part, verbose=False, method=method, restarts=restarts, restart_base=restart_base,
+                                       phase_saving=phase_saving, decompose=True, stats=search,
+                                       lookahead_candidates=lookahead_candidates)
+            splits += part_splits
+            stats.components += 1
+            stats.absorb(search, len(decisions))
+            if not result:
+                stats.skipped_components += len(parts) - i - 1
+                return None
+            variables = component_variables(part)
+            for lit in search.model:
+                if abs(lit) in variables:
+                    model[abs(lit) - 1] = lit
+        return model
+
+    def refuted_nogoods(decisions):
+        # The current node and the True branch of every flipped decision are refuted
+        assigned = [-literal if flipped else literal for literal, flipped in decisions]
+        nogoods = [[-lit for lit in assigned]]
+        for i, (literal, flipped) in enumerate(decisions):
+            if flipped:
+                nogoods.append([-lit for lit in assigned[:i]] + [-literal])
+        return nogoods
+
+    def undo(level):
+        # Heuristic state must be rolled back before the propagator backtracks
+        start = propagator.trail_lim[level]
+        if phase is not None:
+            for lit in propagator.trail[start:]:
+                phase[abs(lit)] = lit
+        if isinstance(heuristic, VSIDS):
+            heuristic.unassign(propagator.trail[start:])
+        elif isinstance(heuristic, (OccurrenceIndex, Lookahead)):
+            heuristic.rollback(start)
+        propagator.backtrack(level)
+
+    while True:
+        stats.tick()
+        indentation = "  " * len(decisions)
+        branch = decisions[-1][0] if decisions else None
+        if decisions and decisions[-1][1]:
+            branch = -branch
+
+        # 1. Unit Propagation
+        trail_size = len(propagator.trail)
+        start = clock()
+        conflict = propagator.propagate()
+        now = clock()
+        stats.add_time("propagation", now - start)
+        stats.propagations += len(propagator.trail) - trail_size
+        if conflict is None:
+            residual = None
+            if isinstance(heuristic, OccurrenceIndex):
+                # 2. Pure Literal Elimination on the occurrence index
+                heuristic.sync()
+                pure_literals = [l for l in heuristic.pure_literals() if l not in constrained]
+                while pure_literals:
+                    for l in pure_literals:
+                        if verbose:
+                            print(f"{indentation}Assigned pure literal {l}")
+                        propagator.assign(l)
+                    heuristic.sync()
+                    pure_literals = [l for l in heuristic.pure_literals() if l not in constrained]
+                if not heuristic.active:
+                    residual = []
+            elif not isinstance(heuristic, VSIDS):
+                residual = list(propagator.residual_clauses())
+
+                # 2. Pure Literal Elimination
+                while residual:
+                    literals = {l for clause in residual for l in clause}
+                    pure_literals = {l for l in literals if -l not in literals and l not in constrained}
+                    if not pure_literals:
+                        break
+                    for l in pure_literals:
+                        propagator.assign(l)
+                    remaining = []
+                    for clause in residual:
+                        if pure_literals.isdisjoint(clause):
+                            remaining.append(clause)
+                        elif verbose:
+                            print(f"{indentation}Removed clause {set(clause)} because it contains a pure literal")
+                    residual = remaining
+
+            start = clock()
+            stats.add_time("simplification", start - now)
+            if residual == [] and cardinality:
+                free = propagator.free_literal()
+                if free is not None:
+                    # Every clause is satisfied: the constraint literals left are set False first
+                    splits += 1
+                    if verbose:
+                        print(f"\n{indentation}Branching on constraint literal {-free} = True")
+                    decisions.append((-free, False))
+                    decide(-free)
+                    continue
+            if residual == []:
+                if verbose:
+                    msg = f"{indentation}Satisfiable after unit propagation and pure literal elimination"
+                    if branch is not None:
+                        msg += f" for branch {branch}"
+                    print(msg)
+                    print("Result: SATISFIABLE")
+                stats.model = [v if propagator.values[v] > 0 else -v for v in range(1, propagator.num_vars + 1)]
+                return stats.finish(True), splits
+
+            parts = ()
+            if decompose and not isinstance(heuristic, VSIDS):
+                parts = split_components(residual if residual is not None else propagator.residual_clauses())
+                now = clock()
+                stats.add_time("simplification", now - start)
+                start = now
+
+            if len(parts) > 1:
+                # 3. Solve the independent components separately
+                if verbose:
+                    print(f"{indentation}Residual formula splits into {len(parts)} independent components")
+                model = solve_components(parts)
+                if model is not None:
+                    if verbose:
+                        print(f"{indentation}Satisfiable: every component is satisfiable")
+                        print("Result: SATISFIABLE")
+                    stats.model = model
+                    return stats.finish(True), splits
+                if verbose:
+                    print(f"{indentation}Unsatisfiable: a component is unsatisfiable, backtracking")
+            else:
+                # 3. Choose a branching literal and try literal = True
+                trail_size = len(propagator.trail)
+                literal = select_literal(residual, indentation, verbose, method=method, state=heuristic)
+                stats.add_time("heuristic", clock() - start)
+                if literal is not None and len(propagator.trail) != trail_size:
+                    # The lookahead asserted failed literals: propagate and simplify again
+                    continue
+                if literal is not None:
+                    if phase is not None and phase[abs(literal)]:
+                        literal = phase[abs(literal)]
+                    splits += 1
+                    if verbose:
+                        print(f"\n{indentation}Branching on {literal} = True")
+                    decisions.append((literal, False))
+                    decide(literal)
+                    continue
+                if isinstance(heuristic, VSIDS):
+                    if verbose:
+                        print(f"{indentation}Satisfiable: every variable is assigned")
+                        print("Result: SATISFIABLE")
+                    stats.model = [v if propagator.values[v] > 0 else -v for v in range(1, propagator.num_vars + 1)]
+                    return stats.finish(True), splits
+                if verbose:
+                    print(f"{indentation}No literal could be selected, backtracking")
+        else:
+            stats.conflicts += 1
+            stats.event("conflict", clause=conflict, depth=len(decisions))
+            if isinstance(heuristic, VSIDS):
+                heuristic.bump_clause(propagator.conflict_literals(conflict))
+            if verbose:
+                msg = f"{indentation}Unsatisfiable after unit propagation"
+                if branch is not None:
+                    msg += f" for branch {branch}"
+                print(msg)
+
+        # 4. Restart, or backtrack to the deepest decision whose literal = False is untried
+        stats.backtracks += 1
+        stats.event("backtrack", depth=len(decisions))
+        if policy is not None and decisions and policy.conflict(len(decisions)):
+            stats.restarts += 1
+            stats.event("restart")
+            if verbose:
+                print(f"Restart {policy.restarts}: backtracking to level 0")
+            nogoods = refuted_nogoods(decisions)
+            undo(0)
+            decisions = []
+            for clause in nogoods:
+                propagator.add_clause(clause)
+            continue
+        while decisions and decisions[-1][1]:
+            literal, _ = decisions.pop()
+            if verbose:
+                print(f"{'  ' * len(decisions)}Unsatisfiable: both branches failed for literal {literal}")
+        if not decisions:
+            if verbose:
+                print("Result: UNSATISFIABLE")
+            return stats.finish(False), splits
+
+        # 5. Try literal = False
+        literal, _ = decisions.pop()
+        undo(len(decisions))
         if verbose:
-            print(f"{indentation}Satisfiable with {literal} = False")
-        if indent == 0 and verbose:
-            print("Result: SATISFIABLE")
-        return True, splits
-
-    # 6. Neither branch led to satisfiability
-    if verbose:
-        print(f"{indentation}Unsatisfiable: both branches failed for literal {literal}")
-    if indent == 0 and verbose:
-        print("Result: UNSATISFIABLE")
-    return False, splits
\ No newline at end of file
+            print(f"\n{'  ' * len(decisions)}Branching on {literal} = False")
+        decisions.append((literal, True))
+        decide(-literal)
@@ -0,0 +1,230 @@
+import random
+from solver.clausedb import ClauseDB
+from solver.stats import SearchStats
+from solver.algorithms.dpll import dpll
+
+LOCAL_SEARCH_METHODS = ("walksat", "probsat")
+
+
+class LocalSearch:
+    """
+    Stochastic local search state for WalkSAT and probSAT.
+
+    Every clause keeps its number of true literals and the XOR of their
+    variables, which is the critical variable when exactly one literal is
+    true. `breaks[v]` counts the clauses v is critical for and `makes[v]` the
+    unsatisfied clauses containing v; both are updated incrementally on every
+    flip by visiting only the occurrence lists of the flipped variable. The
+    unsatisfied clauses are kept in a list with per-clause positions, so they
+    are added, removed and sampled in O(1).
+
+    Tautologies are dropped and repeated literals merged. `best` holds the
+    assignment with the fewest unsatisfied clauses seen so far, one literal per
+    variable.
+    """
+
+    def __init__(self, clauses, seed=None):
+        if isinstance(clauses, ClauseDB):
+            clauses = clauses.clause_lists()
+        self.clauses = []
+        num_vars = 0
+        for clause in clauses:
+            clause = list(dict.fromkeys(clause))
+            # Variables only seen in tautologies still get a value in `best`
+            num_vars = max(num_vars, max((abs(l) for l in clause), default=0))
+            if not any(-l in clause for l in clause):
+                self.clauses.append(clause)
+        self.num_vars = num_vars
+        self.random = random.Random(seed)
+        num_vars = self.num_vars
+        # Indexed directly by the literal: negative literals index from the end
+        self.occurrences = [[] for _ in range(2 * num_vars + 1)]
+        for index, clause in enumerate(self.clauses):
+            for lit in clause:
+                self.occurrences[lit].append(index)
+        self.values = [False] * (num_vars + 1)
+        self.true_count = [0] * len(self.clauses)
+        self.critical = [0] * len(self.clauses)
+        self.breaks = [0] * (num_vars + 1)
+        self.makes = [0] * (num_vars + 1)
+        self.unsat = []
+        self.position = [-1] * len(self.clauses)
+        self.best = None
+        self.best_unsat = len(self.clauses) + 1
+
+    def reset(self, values=None):
+        """
+        Start from `values` (a list indexed by variable) or a random assignment.
+        """
+        num_vars = self.num_vars
+        if values is None:
+            rng = self.random
+            values = [False] + [rng.random() < 0.5 for _ in range(num_vars)]
+        self.values = values
+        self.breaks = breaks = [0] * (num_vars + 1)
+        self.makes = makes = [0] * (num_vars + 1)
+        self.unsat = []
+        self.position = [-1] * len(self.clauses)
+        for index, clause in enumerate(self.clauses):
+            count = critical = 0
+            for lit in clause:
+                if values[abs(lit)] == (lit > 0):
+                    count += 1
+                    critical ^= abs(lit)
+            self.true_count[index] = count
+            self.critical[index] = critical
+            if count == 0:
+                self._add_unsat(index)
+                for lit in clause:
+                    makes[abs(lit)] += 1
+            elif count == 1:
+                breaks[critical] += 1
+        self._record()
+
+    def _add_unsat(self, index):
+        self.position[index] = len(self.unsat)
+        self.unsat.append(index)
+
+    def _remove_unsat(self, index):
+        unsat, position = self.unsat, self.position
+        last = unsat.pop()
+        if last != index:
+            unsat[position[index]] = last
+            position[last] = position[index]
+        position[index] = -1
+
+    def _record(self):
+        if len(self.unsat) < self.best_unsat:
+            self.best_unsat = len(self.unsat)
+            self.best = [v if self.values[v] else -v for v in range(1, self.num_vars + 1)]
+
+    def flip(self, var):
+        values, clauses = self.values, self.clauses
+        true_count, critical, breaks, makes = self.true_count, self.critical, self.breaks, self.makes
+        became_false = var if values[var] else -var
+        values[var] = not values[var]
+        for index in self.occurrences[-became_false]:
+            count = true_count[index]
+            if count == 0:
+                self._remove_unsat(index)
+                for lit in clauses[index]:
+                    makes[abs(lit)] -= 1
+                breaks[var] += 1
+            elif count == 1:
+                breaks[critical[index]] -= 1
+            true_count[index] = count + 1
+            critical[index] ^= var
+        for index in self.occurrences[became_false]:
+            count = true_count[index] - 1
+            critical[index] ^= var
+            true_count[index] = count
+            if count == 0:
+                self._add_unsat(index)
+                for lit in clauses[index]:
+                    makes[abs(lit)] += 1
+                breaks[var] -= 1
+            elif count == 1:
+                breaks[critical[index]] += 1
+
+    def walksat_pick(self, clause, noise):
+        """
+        WalkSAT/SKC: a variable that breaks no clause if there is one,
+        otherwise a random variable with probability `noise` and a variable
+        with the fewest breaks otherwise. Ties go to the variable that
+        satisfies the most unsatisfied clauses, then are broken at random.
+        """
+        breaks, makes, rng = self.breaks, self.makes, self.random
+        variables = [abs(l) for l in clause]
+        least = min(breaks[v] for v in variables)
+        if least > 0 and rng.random() < noise:
+            return rng.choice(variables)
+        candidates = [v for v in variables if breaks[v] == least]
+        most = max(makes[v] for v in candidates)
+        return rng.choice([v for v in candidates if makes[v] == most])
+
+    def probsat_pick(self, clause, cb, eps):
+        """
+        probSAT: a variable drawn with probability proportional to (eps + break) ** -cb.
+        """
+        breaks = self.breaks
+        variables = [abs(l) for l in clause]
+        weights = [(eps + breaks[v]) ** -cb for v in variables]
+        return self.random.choices(variables, weights)[0]
+
+    def run(self, method="walksat", max_flips=100000, max_tries=10, noise=0.5, cb=2.3, eps=1.0,
+            verbose=False, stats=None):
+        """
+        Search for a model with up to `max_tries` random restarts of
+        `max_flips` flips each. Returns (True, flips) once every clause is
+        satisfied, or (None, flips) when the budget runs out: local search
+        cannot prove unsatisfiability.
+        """
+        if stats is None:
+            stats = SearchStats()
+        if method not in LOCAL_SEARCH_METHODS:
+            raise ValueError(f"Unknown local search method: {method}")
+        if any(not clause for clause in self.clauses):
+            return stats.finish(None), 0
+        flips = 0
+        for attempt in range(max_tries):
+            if attempt:
+                stats.restarts += 1
+                stats.event("restart")
+            self.reset()
+            for _ in range(max_flips):
+                if not self.unsat:
+                    break
+                clause = self.clauses[self.unsat[self.random.randrange(len(self.unsat))]]
+                if method == "walksat":
+                    var = self.walksat_pick(clause, noise)
+                else:
+                    var = self.probsat_pick(clause, cb, eps)
+                self.flip(var)
+                flips += 1
+                if len(self.unsat) < self.best_unsat:
+                    self._record()
+                if not flips & 1023:
+                    stats.flips = flips
+                    stats.tick()
+            stats.flips = flips
+            if verbose:
+                print(f"Try {attempt + 1}: {len(self.unsat)} unsatisfied clauses after {flips} flips "
+                      f"(best {self.best_unsat})")
+            if not self.unsat:
+                if verbose:
+                    print("Result: SATISFIABLE")
+                stats.model = self.best
+                return stats.finish(True), flips
+        if verbose:
+            print("Result: UNKNOWN")
+        return stats.finish(None), flips
+
+
+def local_search(clauses, method="walksat", seed=None, max_flips=100000, max_tries=10, noise=0.5,
+                 verbose=True, stats=None):
+    """
+    WalkSAT or probSAT on the formula. Returns (result, flips) where result
+    is True if a model was found and None if the flip budget ran out.
+    """
+    search = LocalSearch(clauses, seed)
+    return search.run(method, max_flips=max_flips, max_tries=max_tries, noise=noise, verbose=verbose, stats=stats)
+
+
+def hybrid(clauses, method="JW", seed=None, max_flips=10000, max_tries=3, noise=0.5, verbose=True, stats=None):
+    """
+    Run a short WalkSAT search and fall back to `dpll` with the branching
+    `method` if it finds no model. The saved phases of the DPLL search start from the best
+    assignment WalkSAT reached, so its first branches explore the assignments
+    closest to a model. Returns (result, splits) like `dpll`.
+    """
+    if stats is None:
+        stats = SearchStats()
+    search = LocalSearch(clauses, seed)
+    result, flips = search.run("walksat", max_flips=max_flips, max_tries=max_tries, noise=noise, verbose=verbose)
+    stats.flips = flips
+    if result:
+        stats.model = search.best
+        return stats.finish(True), 0
+    if verbose:
+        print(f"Local search found no model, falling back to DPLL with {search.best_unsat} unsatisfied clauses")
+    return dpll(clauses, verbose=verbose, method=method, phases=search.best, stats=stats)
@@ -0,0 +1,95 @@
+import multiprocessing
+import queue
+from multiprocessing.shared_memory import SharedMemory
+from solver.clausedb import ClauseDB
+from solver.stats import SearchStats
+from solver.algorithms.dpll import dpll
+from solver.algorithms.cdcl import cdcl
+from solver.algorithms.resolution import dp
+from solver.algorithms.local_search import local_search, LOCAL_SEARCH_METHODS
+
+PORTFOLIO_METHODS = ("JW", "MOMS", "GUP", "VSIDS")
+
+
+def run_member(method, shared, results):
+    """
+    Solve the shared instance with one portfolio member and put
+    (method, result, splits, model) on the results queue. A member that fails
+    puts (method, None, error message, None) instead.
+    """
+    shm = SharedMemory(name=shared[0])
+    clauses = ClauseDB.from_buffer(shm.buf, *shared[1:])
+    stats = SearchStats()
+    try:
+        if method == "dp":
+            result, splits = dp(clauses, verbose=False, stats=stats), 0
+        elif method == "cdcl":
+            counts = {}
+            result, splits = cdcl(clauses, verbose=False, stats=counts)
+            stats.model = counts.get("model")
+        elif method in LOCAL_SEARCH_METHODS:
+            result, splits = local_search(clauses, method=method, verbose=False, stats=stats)
+            if result is None:
+                raise RuntimeError("no model found within the flip budget")
+        else:
+            result, splits = dpll(clauses, verbose=False, method=method, stats=stats)
+        results.put((method, result, splits, stats.model))
+    except Exception as e:
+        results.put((method, None, repr(e), None))
+    finally:
+        # The views into the block must be released before it can be closed
+        clauses = None
+        shm.close()
+
+
+def portfolio(clauses, methods=PORTFOLIO_METHODS, verbose=True, stats=None):
+    """
+    Race several solvers on the same instance, one process each.
+
+    Members are `dpll` branching methods, "cdcl", "dp", "walksat" or
+    "probsat"; a local search member that finds no model counts as failed.
+    The instance is copied once into shared memory as a `ClauseDB` and every
+    member reads it from there. The first answer is returned and the other
+    members are terminated. Returns (result, splits) of the winning member; if a dict is
+    passed as `stats` the winner's name is stored under "winner" and its model,
+    if it found one, under "model".
+    """
+    if not isinstance(clauses, ClauseDB):
+        clauses = ClauseDB(clauses)
+    shm, shared = clauses.share()
+    context = multiprocessing.get_context()
+    results = context.Queue()
+    processes = [context.Process(target=run_member, args=(method, shared, results), daemon=True)
+                 for method in methods]
+    try:
+        for process in processes:
+            process.start()
+        errors = []
+        while len(errors) < len(processes):
+            try:
+                method, result, splits, model = results.get(timeout=0.1)
+            except queue.Empty:
+                if any(process.is_alive() for process in processes) or not results.empty():
+                    continue
+                break
+            if result is None:
+                errors.append(f"{method}: {splits}")
+                continue
+            if verbose:
+                print(f"{method} finished first with {splits} splits")
+                print(f"Result: {'SATISFIABLE' if result else 'UNSATISFIABLE'}")
+            if stats is not None:
+                stats["winner"] = method
+                if model is not None:
+                    stats["model"] = model
+            return result, splits
+        raise RuntimeError(f"No portfolio member found an answer: {errors}")
+    finally:
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+        for process in processes:
+            process.join()
+        results.close()
+        shm.close()
+        shm.unlink()
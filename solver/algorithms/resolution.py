@@ -1,14 +1,8 @@
-from solver.utils import unit_propagation, pure_literal_elimination
-
-def resolve(clause1, clause2):
-    """
-    Resolves two clauses and returns the resulting clause(s) if they can be resolved.
-    """
-    for literal in clause1:
-        if -literal in clause2:
-            new_clause = (clause1 - {literal}) | (clause2 - {-literal})
-            return [new_clause]
-    return []
+import heapq
+import time
+from solver.clausedb import ClauseDB
+from solver.preprocess import signature
+from solver.stats import SearchStats
 
 def is_tautology(clause):
     """
@@ -16,100 +10,212 @@ def is_tautology(clause):
     """
     return any(-lit in clause for lit in clause)
 
-def _resolution_core(clauses, dp=True, verbose=True):
+
+class SubsumptionIndex:
     """
-    Determines if the set of clauses is satisfiable using the resolution method.
-    Logs each step in the process.
+    Clause set with per-literal occurrence lists and 64-bit variable signatures.
+
+    `subsumed` finds a clause that subsumes a new clause by visiting only the
+    occurrence lists of its literals, and `add` removes the clauses the new
+    clause subsumes, so the set never holds a clause and one of its supersets.
     """
-    step = 1
-    clauses = [frozenset(clause) for clause in clauses]
 
-    # Print all initial clauses only if verbose is True
-    if verbose:
-        for clause in clauses:
+    def __init__(self):
+        self.clauses = {}
+        self.signatures = {}
+        self.occurs = {}
+        self.next_id = 0
+
+    def __len__(self):
+        return len(self.clauses)
+
+    def subsumed(self, clause):
+        """
+        Check whether a clause in the index is a subset of `clause`.
+        """
+        sig = signature(clause)
+        clauses, signatures = self.clauses, self.signatures
+        for lit in clause:
+            for i in self.occurs.get(lit, ()):
+                if not signatures[i] & ~sig and len(clauses[i]) <= len(clause) and clauses[i] <= clause:
+                    return True
+        return False
+
+    def add(self, clause):
+        """
+        Add a clause and remove the clauses it subsumes. Returns the removed clauses.
+        """
+        sig = signature(clause)
+        removed = []
+        if clause:
+            rarest = min(clause, key=lambda l: len(self.occurs.get(l, ())))
+            for i in list(self.occurs.get(rarest, ())):
+                other = self.clauses[i]
+                if not sig & ~self.signatures[i] and len(other) >= len(clause) and clause <= other:
+                    removed.append(self.remove(i))
+        i = self.next_id
+        self.next_id += 1
+        self.clauses[i] = clause
+        self.signatures[i] = sig
+        for lit in clause:
+            self.occurs.setdefault(lit, set()).add(i)
+        return removed
+
+    def remove(self, i):
+        clause = self.clauses.pop(i)
+        del self.signatures[i]
+        for lit in clause:
+            self.occurs[lit].discard(i)
+        return clause
+
+    def occurrences(self, lit):
+        return [self.clauses[i] for i in self.occurs.get(lit, ())]
+
+
+def dp(clauses, verbose=True, stats=None):
+    """
+    Davis–Putnam procedure by variable elimination.
+
+    Each step eliminates the variable with the smallest |pos| x |neg| product,
+    replacing the clauses that contain it by their non-tautological resolvents
+    on it. Only that variable's occurrence lists are resolved, and resolvents
+    subsumed by a remaining clause are dropped. Pure literals have a product of
+    0, so they are eliminated first.
+
+    A `SearchStats` passed as `stats` receives the eliminated variables, the
+    added and subsumed resolvents, the time spent choosing variables
+    ("heuristic") and resolving ("resolution"), and an "eliminate" event per
+    variable.
+    """
+    if isinstance(clauses, ClauseDB):
+        clauses = clauses.clause_lists()
+    if stats is None:
+        stats = SearchStats()
+    clock = time.perf_counter
+    index = SubsumptionIndex()
+    step = 1
+    for clause in clauses:
+        clause = frozenset(clause)
+        if verbose:
             print(f"({step}) {set(clause)}")
             step += 1
+        if not clause:
+            if verbose:
+                print("Result: UNSATISFIABLE")
+            return stats.finish(False)
+        if not is_tautology(clause) and not index.subsumed(clause):
+            index.add(clause)
+    if verbose:
         print()
 
-    while True:
-        new = set()
-
-        # Check for an empty clause (unsatisfiable)
-        if not clauses:
-            if dp and verbose:
-                print("Result: SATISFIABLE")
-            return True
-
-        # Apply Unit Propagation if requested
-        if dp:
-            clauses, counter = unit_propagation(clauses, verbose=verbose)
-            if clauses is False:
-                if dp and verbose:
-                    print("Result: UNSATISFIABLE")
-                return False
-            if not clauses:
-                if dp and verbose:
-                    print("Result: SATISFIABLE")
-                return True
-            clauses = pure_literal_elimination(clauses, verbose=verbose)
-            if not clauses:
-                if dp and verbose:
-                    print("Result: SATISFIABLE")
-                return True
-
-        clauses_set = set(clauses)
-        pairs = [(clauses[i], clauses[j]) for i in range(len(clauses)) for j in range(i + 1, len(clauses))]
-        diff = False
-
-        for (c1, c2) in pairs:
-            resolvents = resolve(c1, c2)
-            for resolvent in resolvents:
+    occurs = index.occurs
+    while index:
+        stats.tick()
+        start = clock()
+        var = min({abs(lit) for lit, ids in occurs.items() if ids},
+                  key=lambda v: len(occurs.get(v, ())) * len(occurs.get(-v, ())))
+        pos = index.occurrences(var)
+        neg = index.occurrences(-var)
+        now = clock()
+        stats.add_time("heuristic", now - start)
+        stats.eliminated += 1
+        stats.event("eliminate", var=var, positive=len(pos), negative=len(neg))
+        if verbose:
+            print(f"Eliminating variable {var} ({len(pos)} positive, {len(neg)} negative occurrences)")
+        for i in list(occurs.get(var, ())) + list(occurs.get(-var, ())):
+            index.remove(i)
+        for c1 in pos:
+            for c2 in neg:
+                resolvent = (c1 - {var}) | (c2 - {-var})
+                if is_tautology(resolvent):
+                    continue
+                if index.subsumed(resolvent):
+                    stats.subsumed += 1
+                    continue
+                if verbose:
+                    print(f"({step}) {set(resolvent) if resolvent else '∅'} from {set(c1)} and {set(c2)}")
+                    step += 1
+                stats.resolvents += 1
                 if not resolvent:
                     if verbose:
-                        print(f"({step}) ∅ from {set(c1)} and {set(c2)}")
                         print("Result: UNSATISFIABLE")
-                    return False
-                if frozenset(resolvent) not in clauses_set and not is_tautology(resolvent):
-                    if verbose:
-                        print(f"({step}) {set(resolvent)} from {set(c1)} and {set(c2)}")
-                    clauses_set.add(frozenset(resolvent))
-                    new.add(frozenset(resolvent))
-                    step += 1
+                    return stats.finish(False)
+                index.add(resolvent)
+        stats.add_time("resolution", clock() - now)
 
-        # If no new resolvents were added, it's SAT
-        if not new:
-            if verbose:
-                print("\nNo new resolvent to be added")
-                print("Result: SATISFIABLE")
-            return True
-
-        # Add new resolvents to clauses
-        clauses.extend(new)
-
-        # Apply unit propagation and pure literal elimination after each round
-        if dp:
-            # Apply unit propagation
-            clauses, counter = unit_propagation(clauses, verbose=verbose)
-            if clauses is False:
-                if verbose:
-                    print("Result: UNSATISFIABLE")
-                return False
-            if not clauses:
-                if verbose:
-                    print("Result: SATISFIABLE")
-                return True
+    if verbose:
+        print("Result: SATISFIABLE")
+    return stats.finish(True)
 
-            # Apply pure literal elimination
-            clauses = pure_literal_elimination(clauses, verbose=verbose)
-            if not clauses:
-                if verbose:
-                    print("Result: SATISFIABLE")
-                return True
 
-# Public interface for resolution-only
-def resolution(clauses, verbose=True):
-    return _resolution_core(clauses, dp=False, verbose=verbose)
+def resolution(clauses, verbose=True, stats=None):
+    """
+    Resolution by given-clause saturation.
+
+    Clauses wait in a queue, shortest first. The shortest waiting clause is
+    skipped if it is a tautology or subsumed by a processed clause; otherwise it
+    is resolved against every processed clause it clashes with and then joins
+    them. Each pair of clauses is therefore resolved at most once. The formula
+    is unsatisfiable if the empty clause is derived and satisfiable once the
+    queue is empty.
 
-# Public interface for Davis–Putnam
-def dp(clauses, verbose=True):
-    return _resolution_core(clauses, dp=True, verbose=verbose)
\ No newline at end of file
+    A `SearchStats` passed as `stats` receives the added and subsumed
+    resolvents, the time spent on subsumption checks of given clauses
+    ("simplification") and resolving them ("resolution"), and a "given" event
+    per processed clause.
+    """
+    if isinstance(clauses, ClauseDB):
+        clauses = clauses.clause_lists()
+    if stats is None:
+        stats = SearchStats()
+    clock = time.perf_counter
+    step = 1
+    queue = []
+    for clause in clauses:
+        clause = frozenset(clause)
+        if verbose:
+            print(f"({step}) {set(clause)}")
+            step += 1
+        heapq.heappush(queue, (len(clause), len(queue), clause))
+    if verbose:
+        print()
+
+    processed = SubsumptionIndex()
+    count = len(queue)
+    while queue:
+        stats.tick()
+        _, _, given = heapq.heappop(queue)
+        if not given:
+            if verbose:
+                print("Result: UNSATISFIABLE")
+            return stats.finish(False)
+        start = clock()
+        if is_tautology(given) or processed.subsumed(given):
+            stats.subsumed += 1
+            stats.add_time("simplification", clock() - start)
+            continue
+        processed.add(given)
+        now = clock()
+        stats.add_time("simplification", now - start)
+        stats.event("given", clause=given)
+        for lit in given:
+            for other in processed.occurrences(-lit):
+                resolvent = (given - {lit}) | (other - {-lit})
+                if is_tautology(resolvent) or processed.subsumed(resolvent):
+                    continue
+                if verbose:
+                    print(f"({step}) {set(resolvent) if resolvent else '∅'} from {set(given)} and {set(other)}")
+                    step += 1
+                stats.resolvents += 1
+                if not resolvent:
+                    if verbose:
+                        print("Result: UNSATISFIABLE")
+                    return stats.finish(False)
+                count += 1
+                heapq.heappush(queue, (len(resolvent), count, resolvent))
+        stats.add_time("resolution", clock() - now)
+
+    if verbose:
+        print("\nNo new resolvent to be added")
+        print("Result: SATISFIABLE")
+    return stats.finish(True)
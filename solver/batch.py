@@ -0,0 +1,395 @@
+import os
+import sys
+import json
+import time
+import queue
+import signal
+import socket
+import argparse
+import threading
+import socketserver
+import multiprocessing
+from collections import deque
+from multiprocessing import resource_tracker
+from multiprocessing.connection import wait
+from solver.cache import InstanceCache
+from solver.parser import parse_dimacs_cnf, is_cardinality_cnf, parse_cardinality_cnf
+from solver.solver import solve, SOLVING_METHODS
+
+# Longest delay before a job submitted while every worker is busy is noticed
+POLL_INTERVAL = 0.05
+
+# Seconds a worker gets after SIGTERM to stop the processes of its job before its whole group is killed
+TERMINATE_GRACE = 1.0
+
+# Process id of the worker in worker processes
+WORKER_PID = None
+
+
+def job_record(job, **fields):
+    record = {"id": job.get("id"), "file": job.get("file"), "method": job.get("method")}
+    record.update(fields)
+    return record
+
+
+def parse_job(line, method="first", timeout=None):
+    """
+    Return the job described by one input line: a JSON object with "file" and
+    optionally "id", "method", "options" (keyword arguments of `solve`) and
+    "timeout" in seconds, or a bare CNF path. Missing fields take the given
+    defaults. Returns None for blank lines.
+    """
+    line = line.strip()
+    if not line:
+        return None
+    job = json.loads(line) if line.startswith("{") else {"file": line}
+    job.setdefault("id", None)
+    job.setdefault("method", method)
+    job.setdefault("options", {})
+    job.setdefault("timeout", timeout)
+    return job
+
+
+def run_job(job, cache=None):
+    """
+    Parse and solve one job. Returns its record with status (SAT, UNSAT,
+    UNKNOWN or error), model, time and the solver statistics, and the number
+    of models for "count" jobs.
+    """
+    start_time = time.perf_counter()
+    record = job_record(job)
+    try:
+        options = dict(job["options"])
+        if is_cardinality_cnf(job["file"]):
+            num_vars, _, clauses, options["cardinality"] = parse_cardinality_cnf(job["file"])
+        else:
+            num_vars, _, clauses = parse_dimacs_cnf(job["file"], compact=True, cache=cache)
+        stats = {}
+        if job["method"] == "count":
+            # Variables declared in the header but unused still double the count
+            result = solve(clauses, method="count", stats=stats, **{"num_vars": num_vars, **options})
+            record["count"] = result[0]
+        elif job["method"] in SOLVING_METHODS:
+            result = solve(clauses, method=job["method"], stats=stats, **options)
+        else:
+            result = solve(clauses, branching_method=job["method"], stats=stats, **options)
+        if isinstance(result, tuple):
+            result = result[0]
+        record["status"] = "SAT" if result else ("UNKNOWN" if result is None else "UNSAT")
+        record["model"] = stats.pop("model", None)
+        record["stats"] = stats
+    except Exception as e:
+        record.update(status="error", error=repr(e))
+    record["time"] = time.perf_counter() - start_time
+    return record
+
+
+def stop_worker(signum, frame):
+    if os.getpid() != WORKER_PID:
+        # A forked portfolio or cube member: die of the signal as without the handler
+        signal.signal(signum, signal.SIG_DFL)
+        os.kill(os.getpid(), signum)
+    # Unwinding the job lets portfolio and cube stop their members and unlink their shared memory
+    raise SystemExit(1)
+
+
+def kill_worker(process):
+    """
+    Stop a worker with SIGTERM, then kill it and every process its job
+    started, which share its process group, if it is not done after
+    TERMINATE_GRACE seconds.
+    """
+    if process.is_alive():
+        process.terminate()
+        process.join(TERMINATE_GRACE)
+    if hasattr(os, "killpg"):
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass  # Nothing left in the group
+    elif process.is_alive():
+        process.kill()
+
+
+def serve_worker(conn, cache_dir):
+    """
+    Worker loop: solve the jobs received on `conn` until a None sentinel.
+
+    The worker leads its own process group, so a timeout can also kill the
+    processes a portfolio or cube job started. SIGTERM stops the current job
+    and the worker.
+    """
+    global WORKER_PID
+    WORKER_PID = os.getpid()
+    if hasattr(os, "setsid"):
+        os.setsid()
+    signal.signal(signal.SIGTERM, stop_worker)
+    # Solver output must not mix with the JSONL results on stdout
+    sys.stdout = sys.stderr
+    cache = InstanceCache(cache_dir) if cache_dir else None
+    for job in iter(conn.recv, None):
+        conn.send(run_job(job, cache))
+    conn.close()
+
+
+class WorkerPool:
+    """
+    Pool of warm solver processes.
+
+    Every worker imports the solver once and then solves jobs until the pool
+    is closed, so a job only pays for parsing and solving. Submitted jobs go to
+    idle workers in order from a dispatcher thread. Its callback gets the
+    record as soon as the job finishes. A worker that exceeds its job's
+    timeout, or dies, is replaced by a new one and the job reports status
+    "timeout" or "crashed". A timed-out worker is asked to stop with SIGTERM
+    first, then its process group is killed.
+
+    Workers are not daemonic so that portfolio and cube jobs can start their
+    own processes. They do not receive the Ctrl-C of the terminal; `terminate`
+    kills them all.
+    """
+
+    def __init__(self, workers=None, cache_dir=None):
+        self.cache_dir = cache_dir
+        self.context = multiprocessing.get_context()
+        if os.name == "posix":
+            # Workers use this tracker, outside their process groups: shared memory left by a killed
+            # job is unlinked when the pool exits
+            resource_tracker.ensure_running()
+        self.pending = queue.Queue()
+        self.stopping = False
+        self.idle = [self._spawn() for _ in range(workers or os.cpu_count() or 1)]
+        self.busy = {}  # connection -> (process, job, callback, start time, deadline)
+        self.thread = threading.Thread(target=self._dispatch, daemon=True)
+        self.thread.start()
+
+    def _spawn(self):
+        conn, child = self.context.Pipe()
+        process = self.context.Process(target=serve_worker, args=(child, self.cache_dir))
+        process.start()
+        child.close()
+        return process, conn
+
+    def _replace(self, process, conn):
+        kill_worker(process)
+        process.join()
+        conn.close()
+        if not self.stopping:
+            self.idle.append(self._spawn())
+
+    def submit(self, job, callback):
+        self.pending.put((job, callback))
+
+    def close(self):
+        """
+        Wait for every submitted job, then stop the workers.
+        """
+        self.pending.put(None)
+        self.thread.join()
+
+    def terminate(self):
+        """
+        Kill every worker and the processes of their jobs without waiting for the jobs.
+        """
+        self.stopping = True
+        workers = list(self.idle) + [(process, conn) for conn, (process, *_) in list(self.busy.items())]
+        for process, _ in workers:
+            kill_worker(process)
+            process.join()
+
+    def _dispatch(self):
+        backlog = deque()
+        closing = False
+        while not closing or backlog or self.busy:
+            try:
+                item = self.pending.get(block=not (backlog or self.busy or closing))
+                while True:
+                    if item is None:
+                        closing = True
+                    else:
+                        backlog.append(item)
+                    item = self.pending.get_nowait()
+            except queue.Empty:
+                pass
+
+            while backlog and self.idle:
+                job, callback = backlog.popleft()
+                process, conn = self.idle.pop()
+                conn.send(job)
+                start = time.perf_counter()
+                deadline = start + job["timeout"] if job.get("timeout") else None
+                self.busy[conn] = (process, job, callback, start, deadline)
+            if not self.busy:
+                continue
+
+            now = time.perf_counter()
+            wake = min([d for _, _, _, _, d in self.busy.values() if d is not None] + [now + POLL_INTERVAL])
+            for conn in wait(list(self.busy), max(0, wake - now)):
+                process, job, callback, start, _ = self.busy.pop(conn)
+                try:
+                    record = conn.recv()
+                    self.idle.append((process, conn))
+                except EOFError:
+                    # Killed before reporting, e.g. by the OOM killer
+                    record = job_record(job, status="crashed", time=time.perf_counter() - start)
+                    self._replace(process, conn)
+                callback(record)
+
+            now = time.perf_counter()
+            for conn, (process, job, callback, start, deadline) in list(self.busy.items()):
+                if deadline is not None and now >= deadline:
+                    del self.busy[conn]
+                    self._replace(process, conn)
+                    callback(job_record(job, status="timeout", time=now - start))
+
+        for process, conn in self.idle:
+            conn.send(None)
+            process.join()
+            conn.close()
+
+
+def run_batch(lines, pool, output, method="first", timeout=None):
+    """
+    Submit one job per input line and write every record to `output` as a
+    JSON line when its job finishes. Returns once all jobs are done.
+    """
+    lock = threading.Lock()
+
+    def emit(record):
+        with lock:
+            try:
+                output.write(json.dumps(record) + "\n")
+                output.flush()
+            except BrokenPipeError:
+                pass  # The reader stopped early, e.g. `| head`
+
+    for line in lines:
+        try:
+            job = parse_job(line, method, timeout)
+        except ValueError as e:
+            emit({"id": None, "file": None, "method": None, "status": "error", "error": f"invalid job: {e}"})
+            continue
+        if job is not None:
+            pool.submit(job, emit)
+    pool.close()
+
+
+class JobHandler(socketserver.StreamRequestHandler):
+    """
+    Read JSONL jobs from a client connection and stream the records back on
+    it. The connection is closed once the client has shut down its side and
+    every job it sent has finished.
+    """
+
+    def handle(self):
+        done = threading.Condition()
+        outstanding = [0]
+
+        def emit(record):
+            with done:
+                try:
+                    self.wfile.write((json.dumps(record) + "\n").encode())
+                    self.wfile.flush()
+                except OSError:
+                    pass  # The client went away; its remaining jobs still run
+                outstanding[0] -= 1
+                done.notify_all()
+
+        for line in self.rfile:
+            try:
+                job = parse_job(line.decode(), self.server.method, self.server.timeout)
+            except ValueError as e:
+                job = None
+                with done:
+                    outstanding[0] += 1
+                emit({"id": None, "file": None, "method": None, "status": "error", "error": f"invalid job: {e}"})
+            if job is not None:
+                with done:
+                    outstanding[0] += 1
+                self.server.pool.submit(job, emit)
+        with done:
+            done.wait_for(lambda: outstanding[0] == 0)
+
+
+def serve(path, pool, method="first", timeout=None):
+    """
+    Serve jobs on a Unix socket at `path` until interrupted.
+    """
+    if os.path.exists(path):
+        os.unlink(path)
+    server = socketserver.ThreadingUnixStreamServer(path, JobHandler)
+    server.daemon_threads = True
+    server.pool, server.method, server.timeout = pool, method, timeout
+    print(f"Serving on {path}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        os.unlink(path)
+        pool.close()
+
+
+def connect(path, lines, output):
+    """
+    Send jobs to a server on the Unix socket `path` and copy the records it returns to `output`.
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.connect(path)
+
+        def send():
+            for line in lines:
+                client.sendall(line.rstrip("\n").encode() + b"\n")
+            client.shutdown(socket.SHUT_WR)
+
+        sender = threading.Thread(target=send, daemon=True)
+        sender.start()
+        for line in client.makefile("r"):
+            output.write(line)
+            output.flush()
+        sender.join()
+
+
+def input_lines(paths):
+    """
+    Yield one job line per CNF file of `paths` (files or folders), or the lines of stdin if `paths` is empty.
+    """
+    if not paths:
+        yield from sys.stdin
+        return
+    for path in paths:
+        if os.path.isdir(path):
+            for f in sorted(os.listdir(path)):
+                if ".cnf" in f:
+                    yield os.path.join(path, f)
+        else:
+            yield path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Solve many CNF files with one pool of warm solver processes.")
+    parser.add_argument("paths", nargs="*", help="CNF files or folders. Without paths, jobs are read from stdin as JSON lines or CNF paths.")
+    parser.add_argument("--method", type=str, default="first", help="Default method or branching heuristic of the jobs.")
+    parser.add_argument("--timeout", type=float, default=None, help="Default wall-clock limit per job in seconds.")
+    parser.add_argument("--workers", type=int, default=None, help="Number of worker processes (default: all cores).")
+    parser.add_argument("--cache-dir", type=str, default=None, help="Directory of the parsed-instance cache.")
+    parser.add_argument("--socket", type=str, default=None, help="Serve jobs on this Unix socket instead of reading them.")
+    parser.add_argument("--connect", type=str, default=None, help="Send the jobs to a server on this Unix socket.")
+    args = parser.parse_args()
+
+    if args.connect:
+        connect(args.connect, input_lines(args.paths), sys.stdout)
+        return
+    pool = WorkerPool(args.workers, args.cache_dir)
+    try:
+        if args.socket:
+            serve(args.socket, pool, args.method, args.timeout)
+        else:
+            run_batch(input_lines(args.paths), pool, sys.stdout, args.method, args.timeout)
+    except KeyboardInterrupt:
+        pool.terminate()
+
+
+if __name__ == "__main__":
+    main()
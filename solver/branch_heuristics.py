@@ -1,11 +1,59 @@
 import random
 from collections import Counter
 from solver.utils import *
+from solver.propagation import WatchedPropagator
+from solver.vsids import VSIDS
+from solver.occurrences import OccurrenceIndex
+from solver.lookahead import Lookahead
+from solver import vectorized
 
-def select_literal(clauses, indentation, verbose=True, method="first"):
+def select_literal(clauses, indentation, verbose=True, method="first", state=None):
     """
     Selects a branching literal according to the given method.
+
+    `VSIDS` keeps its activities between decisions in `state`, a `VSIDS`
+    instance bound to the search's propagator; without one, a fresh instance is
+    built from the clauses. MAXO, MOMS, MAMS and JW read their scores from
+    `state` when it is an `OccurrenceIndex` instead of rescanning the clauses.
+    UP, GUP and SUP probe candidates with a `Lookahead`: on the search trail
+    when `state` is one, which may assert failed literals on its propagator,
+    and otherwise on a fresh `WatchedPropagator` over the clauses.
+
+    Without an `OccurrenceIndex` and with NumPy installed, MAXO, MOMS, MAMS
+    and JW score formulas of at least `vectorized.MIN_CLAUSES` clauses with
+    `vectorized.select_flat`, which makes the same choices as the loops below.
+    These are the calls without a search state: cubing, model counting and
+    the SUP candidates. DPLL always passes an `OccurrenceIndex` for these
+    methods, so its search never reaches the NumPy path.
     """
+    if method == "VSIDS":
+        if state is None:
+            state = VSIDS(WatchedPropagator(clauses))
+        return state.select()
+
+    if isinstance(state, OccurrenceIndex) and method in OccurrenceIndex.METHODS:
+        return state.select(method)
+
+    if method in Lookahead.METHODS:
+        candidates = None
+        if method == "SUP":
+            candidates = list(dict.fromkeys(select_literal(clauses, indentation, method=m)
+                                            for m in ["MAXO", "MOMS", "MAMS", "JW"]))
+        if isinstance(state, Lookahead):
+            return state.select(clauses, method, candidates, indentation, verbose)
+        propagator = WatchedPropagator(clauses)
+        literal = None
+        if propagator.propagate() is None:
+            literal = Lookahead(propagator).select(clauses, method, candidates, indentation, verbose)
+        # Without a search state a refuted formula still needs a branching literal
+        return literal if literal is not None else next(iter(next(iter(clauses))))
+
+    if (method in vectorized.METHODS and vectorized.np is not None
+            and len(clauses) >= vectorized.MIN_CLAUSES):
+        literal = vectorized.select_flat(clauses, method)
+        if literal is not None:
+            return literal
+
     literals = [l for clause in clauses for l in clause]
     literal_set = set(literals)
 
@@ -17,74 +65,28 @@ def select_literal(clauses, indentation, verbose=True, method="first"):
 
     if method == "MAXO":
         counter = Counter(literals)
-        return counter.most_common(1)[0][0]
+        return best_scoring_literal(counter, counter)
 
     if method == "MOMS":
         min_size = min(len(c) for c in clauses)
         min_clauses = [c for c in clauses if len(c) == min_size]
         counter = Counter(l for c in min_clauses for l in c)
-        return counter.most_common(1)[0][0]
+        return best_scoring_literal(counter, counter)
 
     if method == "MAMS":
         counter_all = Counter(literals)
         min_size = min(len(c) for c in clauses)
         min_clauses = [c for c in clauses if len(c) == min_size]
         counter_min = Counter(l for c in min_clauses for l in c)
-        best_literal = None
-        best_score = -1
-        for l in literal_set:
-            score = counter_all[l] + counter_min[-l]
-            if score > best_score:
-                best_score = score
-                best_literal = l
-        return best_literal
+        scores = {l: counter_all[l] + counter_min[-l] for l in literal_set}
+        return best_scoring_literal(literal_set, scores)
 
     if method == "JW":
         scores = {}
         for clause in clauses:
             for l in clause:
                 scores[l] = scores.get(l, 0) + 2 ** (-len(clause))
-        return max(scores, key=scores.get)
-
-    if method == "UP" or method == "GUP":
-        best_literal = None
-        best_score = -1
-        for l in literal_set:
-            # Try setting l = True
-            score = count_unit_propagations(clauses, l, indentation, verbose)
-            if method == "GUP" and (score == 0 or score == float('inf')):
-                return l  # Immediate contradiction OR immediate satisfaction
-            if score > best_score:
-                best_score = score
-                best_literal = l
-        return best_literal
-
-    if method == "SUP":
-        candidates = []
-        for m in ["MAXO", "MOMS", "MAMS", "JW"]:
-            candidates.append(select_literal(clauses, indentation, method=m))
-        candidates = list(set(candidates))  # Remove duplicates
-        best_literal = None
-        best_score = -1
-        for l in candidates:
-            score = count_unit_propagations(clauses, l, indentation, verbose)
-            if score > best_score:
-                best_score = score
-                best_literal = l
-        return best_literal
+        return best_scoring_literal(scores, scores)
 
     raise ValueError(f"Unknown selection method: {method}")
 
-
-def count_unit_propagations(clauses, literal, indentation, verbose):
-    """
-    Try assigning 'literal = True' and count how many unit propagations happen.
-    If conflict occurs, return -1.
-    """
-    new_clauses = clauses + [frozenset([literal])]
-    result, count = unit_propagation(new_clauses, indentation, verbose = False)
-    if result is False:
-        return 0  # conflict
-    if not result:
-        return float("inf")
-    return count
\ No newline at end of file
@@ -0,0 +1,165 @@
+import hashlib
+import mmap
+import os
+import struct
+from array import array
+from solver.clausedb import ClauseDB
+
+# Environment variable that enables the cache for every `parse_dimacs_cnf` call
+CACHE_DIR_ENV = "SAT_SOLVER_CACHE_DIR"
+
+MAGIC = b"SATC"
+VERSION = 1
+# magic, version, num_vars, num_clauses, db num_vars, literal count, offset count,
+# source size, source mtime (ns), source content digest
+HEADER = struct.Struct("=4sIqqqqqqq32s")
+
+
+def file_digest(file_path, chunk_size=1 << 20):
+    """
+    Return the BLAKE2b digest of a file's contents.
+    """
+    digest = hashlib.blake2b(digest_size=32)
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.digest()
+
+
+class InstanceCache:
+    """
+    On-disk cache of parsed CNF instances.
+
+    Each entry stores the literal and offset buffers of a `ClauseDB` behind a
+    fixed header, in native byte order. Entries are named after the absolute
+    path of the CNF file and record its size, mtime and content digest: an entry
+    is used when size and mtime match, or when only the mtime changed but the
+    content digest still matches.
+
+    Loaded instances are memory-mapped by default, so their buffers are
+    read-only memoryviews and pages are only read when the solver touches them.
+    Every hit refreshes the entry's mtime, and storing an entry evicts the least
+    recently used ones until the cache fits in `max_bytes`.
+    """
+
+    SUFFIX = ".satc"
+
+    def __init__(self, cache_dir, max_bytes=512 * 2 ** 20):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def entry_path(self, file_path):
+        name = hashlib.blake2b(os.path.abspath(file_path).encode(), digest_size=16).hexdigest()
+        return os.path.join(self.cache_dir, name + self.SUFFIX)
+
+    def load(self, file_path, use_mmap=True):
+        """
+        Return (num_vars, num_clauses, ClauseDB) for a cached file, or None on a
+        miss. Entries are opened read-only; an entry that cannot be read is a miss.
+        """
+        entry = self.entry_path(file_path)
+        try:
+            with open(entry, "rb") as f:
+                header = HEADER.unpack(f.read(HEADER.size))
+                magic, version, num_vars, num_clauses, db_vars, n_literals, n_offsets, size, mtime, digest = header
+                stat = os.stat(file_path)
+                if magic != MAGIC or version != VERSION or size != stat.st_size:
+                    self.misses += 1
+                    return None
+                if mtime != stat.st_mtime_ns:
+                    if digest != file_digest(file_path):
+                        self.misses += 1
+                        return None
+                    self.refresh(entry, header[:8] + (stat.st_mtime_ns, digest))
+                if use_mmap:
+                    buffer = memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+                    db = ClauseDB.from_buffer(buffer[HEADER.size:], n_literals, n_offsets, db_vars)
+                else:
+                    db = ClauseDB(num_vars=db_vars)
+                    db.literals = array("i", f.read(4 * n_literals))
+                    db.offsets = array("i", f.read(4 * n_offsets))
+        except (OSError, struct.error, ValueError):
+            self.misses += 1
+            return None
+        try:
+            os.utime(entry)
+        except OSError:
+            pass  # A read-only cache still serves its entries, only the LRU order goes stale
+        self.hits += 1
+        return num_vars, num_clauses, db
+
+    def refresh(self, entry, header):
+        """
+        Record a new source mtime in an entry's header. Best effort: if the
+        entry cannot be written the digest is simply checked again next time.
+        """
+        try:
+            with open(entry, "r+b") as f:
+                f.write(HEADER.pack(*header))
+        except OSError:
+            pass
+
+    def store(self, file_path, num_vars, num_clauses, db):
+        """
+        Write the parsed instance of a file to the cache and evict old entries.
+        Returns False if the entry could not be written, e.g. on a full or
+        read-only disk; the cache is then left as it was.
+        """
+        entry = self.entry_path(file_path)
+        temp = f"{entry}.{os.getpid()}.tmp"
+        try:
+            stat = os.stat(file_path)
+            header = HEADER.pack(MAGIC, VERSION, num_vars, num_clauses, db.num_vars,
+                                 len(db.literals), len(db.offsets),
+                                 stat.st_size, stat.st_mtime_ns, file_digest(file_path))
+            with open(temp, "wb") as f:
+                f.write(header)
+                f.write(db.literals.tobytes())
+                f.write(db.offsets.tobytes())
+            os.replace(temp, entry)
+        except OSError:
+            try:
+                os.remove(temp)
+            except OSError:
+                pass
+            return False
+        self.evict()
+        return True
+
+    def evict(self):
+        """
+        Remove the least recently used entries until the cache fits in max_bytes.
+        """
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(self.SUFFIX):
+                try:
+                    stat = os.stat(os.path.join(self.cache_dir, name))
+                except FileNotFoundError:
+                    continue  # Evicted by another process
+                entries.append((stat.st_mtime_ns, stat.st_size, name))
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.cache_dir, name))
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def clear(self):
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(self.SUFFIX):
+                os.remove(os.path.join(self.cache_dir, name))
+
+
+def default_cache():
+    """
+    Return an InstanceCache for the directory named by SAT_SOLVER_CACHE_DIR, or None if it is unset.
+    """
+    cache_dir = os.environ.get(CACHE_DIR_ENV)
+    return InstanceCache(cache_dir) if cache_dir else None
@@ -0,0 +1,184 @@
+from collections import defaultdict
+from itertools import combinations
+from solver.propagation import WatchedPropagator
+
+
+def at_least(literals, k):
+    """
+    Return the at-most constraint (literals, bound) equivalent to at least k of `literals` being True.
+    """
+    literals = list(literals)
+    return [-l for l in literals], len(literals) - k
+
+
+def cardinality_clauses(literals, k):
+    """
+    Encode "at most k of `literals` are True" in CNF: one clause per k + 1
+    literals, which is the pairwise encoding for k = 1. The encoding grows
+    with the binomial coefficient, so it is only meant for solvers without
+    native constraints.
+    """
+    return [[-l for l in subset] for subset in combinations(literals, k + 1)]
+
+
+def detect_at_most_one(clauses, min_size=3):
+    """
+    Recognize at-most-one constraints written as pairwise binary clauses.
+
+    A binary clause (-a -b) forbids a and b from being True together. Cliques
+    of such literals are grown greedily from the literals with the most
+    exclusions, over the exclusions of the seed that no clique covers yet.
+    Candidates are tried in order of how many other candidates they exclude,
+    which keeps a large clique such as the colors of one vertex together
+    instead of mixing it with smaller ones. Every clique of at least
+    `min_size` literals that covers two or more binary clauses not yet
+    covered becomes one constraint. The binary clauses inside a clique are
+    dropped.
+
+    Returns (clauses, constraints) where constraints are (literals, 1) pairs.
+    """
+    clauses = list(clauses)
+    excludes = defaultdict(set)  # literal -> literals that cannot be True with it
+    for clause in clauses:
+        if len(clause) == 2:
+            a, b = (-l for l in clause)
+            if a != -b:
+                excludes[a].add(b)
+                excludes[b].add(a)
+
+    covered = set()
+    uncovered = {lit: set(others) for lit, others in excludes.items()}
+    constraints = []
+    for seed in sorted(excludes, key=lambda lit: (-len(excludes[lit]), abs(lit), lit)):
+        candidates = uncovered[seed]
+        clique = [seed]
+        for lit in sorted(candidates, key=lambda lit: (-len(excludes[lit] & candidates), abs(lit), lit)):
+            if all(lit in excludes[member] for member in clique[1:]):
+                clique.append(lit)
+        if len(clique) < min_size:
+            continue
+        pairs = {frozenset(pair) for pair in combinations(clique, 2)}
+        if len(pairs - covered) < 2:
+            continue
+        covered |= pairs
+        for member in clique:
+            uncovered[member].difference_update(clique)
+        constraints.append((clique, 1))
+    remaining = [clause for clause in clauses
+                 if len(clause) != 2 or frozenset(-l for l in clause) not in covered]
+    return remaining, constraints
+
+
+class CardinalityPropagator(WatchedPropagator):
+    """
+    `WatchedPropagator` that also propagates at-most-k constraints natively.
+
+    Every constraint keeps a counter of its True literals, updated when a
+    literal is assigned or unassigned. Once the counter reaches k the
+    remaining literals are set to False, and a counter above k is a conflict.
+    An at-most-one over n literals therefore costs O(n) memory instead of
+    n * (n - 1) / 2 binary clauses.
+
+    Constraints are checked in a second pass over the trail with their own
+    head, after the clause watches. Conflicts and reasons coming from a
+    constraint are reported as the negative index -(c + 1);
+    `conflict_literals` turns them into the falsified clause they imply.
+    Constraints must be added at the root.
+    """
+
+    def __init__(self, clauses, constraints=(), num_vars=None):
+        self.constraints = []
+        self.counts = []
+        self.constraint_watches = None  # Unit clauses are assigned before the lists exist
+        self.constraint_head = 0
+        super().__init__(clauses, num_vars)
+        self.constraint_watches = [[] for _ in range(2 * self.num_vars + 1)]
+        for literals, k in constraints:
+            self.add_at_most(literals, k)
+
+    def add_variables(self, num_vars):
+        extra = num_vars - self.num_vars
+        if extra > 0 and self.constraint_watches is not None:
+            self.constraint_watches[self.num_vars + 1:self.num_vars + 1] = [[] for _ in range(2 * extra)]
+        super().add_variables(num_vars)
+
+    def add_at_most(self, literals, k):
+        """
+        Add the constraint "at most k of `literals` are True". Returns its index.
+        """
+        literals = list(dict.fromkeys(literals))
+        self.add_variables(max((abs(l) for l in literals), default=0))
+        index = len(self.constraints)
+        reason = -(index + 1)
+        self.constraints.append((literals, k))
+        count = sum(1 for l in literals if self.value(l) > 0)
+        self.counts.append(count)
+        for lit in literals:
+            self.constraint_watches[lit].append(index)
+        if count > k:
+            if self.conflict is None:
+                self.conflict = reason
+        elif count == k:
+            for lit in literals:
+                if not self.values[abs(lit)]:
+                    self.assign(-lit, reason)
+        return index
+
+    def assign(self, literal, reason=None):
+        value = self.values[abs(literal)]
+        if value:
+            return (value > 0) == (literal > 0)
+        super().assign(literal, reason)
+        if self.constraint_watches is not None:
+            counts = self.counts
+            for index in self.constraint_watches[literal]:
+                counts[index] += 1
+        return True
+
+    def propagate(self):
+        trail, values = self.trail, self.values
+        while True:
+            conflict = super().propagate()
+            if conflict is not None or self.constraint_head == len(trail):
+                return conflict
+            while self.constraint_head < len(trail):
+                literal = trail[self.constraint_head]
+                self.constraint_head += 1
+                for index in self.constraint_watches[literal]:
+                    literals, k = self.constraints[index]
+                    count = self.counts[index]
+                    if count > k:
+                        return -(index + 1)
+                    if count == k:
+                        for lit in literals:
+                            if not values[abs(lit)]:
+                                self.assign(-lit, -(index + 1))
+
+    def backtrack(self, level):
+        if level >= len(self.trail_lim):
+            return
+        start = self.trail_lim[level]
+        counts, watches = self.counts, self.constraint_watches
+        for literal in self.trail[start:]:
+            for index in watches[literal]:
+                counts[index] -= 1
+        super().backtrack(level)
+        self.constraint_head = min(self.constraint_head, start)
+
+    def conflict_literals(self, index):
+        if index >= 0:
+            return self.clauses[index]
+        literals, _ = self.constraints[-index - 1]
+        return [-l for l in literals if self.value(l) > 0]
+
+    def free_literal(self):
+        """
+        Return an unassigned literal of some constraint, or None. The clauses
+        alone do not fix these, so the search must still assign them.
+        """
+        values = self.values
+        for literals, _ in self.constraints:
+            for lit in literals:
+                if not values[abs(lit)]:
+                    return lit
+        return None
@@ -0,0 +1,184 @@
+from array import array
+from itertools import accumulate, compress, count, repeat
+from operator import add, ne, not_, sub
+from collections.abc import Set
+from multiprocessing.shared_memory import SharedMemory
+
+
+def encode(literal):
+    """
+    Encode a DIMACS literal as 2 * var + sign, where sign is 1 for negative literals.
+    """
+    return (literal << 1) if literal > 0 else ((-literal << 1) | 1)
+
+
+def decode(code):
+    """
+    Decode a 2 * var + sign literal back to its DIMACS form.
+    """
+    return -(code >> 1) if code & 1 else code >> 1
+
+
+class Clause(Set):
+    """
+    Read-only handle to one clause of a `ClauseDB`.
+
+    Handles behave like frozensets of DIMACS literals (iteration, len, `in`,
+    set operators), so the set-based code paths can consume a `ClauseDB`
+    without materialising it. Set operators return plain frozensets.
+    """
+
+    __slots__ = ("db", "index")
+
+    def __init__(self, db, index):
+        self.db = db
+        self.index = index
+
+    @classmethod
+    def _from_iterable(cls, iterable):
+        return frozenset(iterable)
+
+    def codes(self):
+        """
+        Return the encoded literals of the clause as a slice of the buffer.
+        """
+        offsets = self.db.offsets
+        return self.db.literals[offsets[self.index]:offsets[self.index + 1]]
+
+    def __len__(self):
+        offsets = self.db.offsets
+        return offsets[self.index + 1] - offsets[self.index]
+
+    def __iter__(self):
+        for code in self.codes():
+            yield -(code >> 1) if code & 1 else code >> 1
+
+    def __contains__(self, literal):
+        return encode(literal) in self.codes()
+
+    def __hash__(self):
+        return self._hash()
+
+    def __repr__(self):
+        return f"Clause({set(self)})"
+
+
+class ClauseDB:
+    """
+    Compact clause database.
+
+    All literals live in one flat `array('i')` buffer, encoded as 2 * var + sign,
+    and `offsets[i]:offsets[i + 1]` is the slice of clause i. This takes a few
+    bytes per literal instead of a Python set per clause. Indexing or iterating
+    the database yields `Clause` handles.
+    """
+
+    __slots__ = ("literals", "offsets", "num_vars")
+
+    def __init__(self, clauses=(), num_vars=0):
+        self.literals = array("i")
+        self.offsets = array("i", [0])
+        self.num_vars = num_vars
+        for clause in clauses:
+            self.add_clause(clause)
+
+    def add_clause(self, clause):
+        """
+        Append a clause given as DIMACS literals and return its index.
+        """
+        for literal in clause:
+            self.literals.append(encode(literal))
+            if abs(literal) > self.num_vars:
+                self.num_vars = abs(literal)
+        self.offsets.append(len(self.literals))
+        return len(self.offsets) - 2
+
+    def add_dimacs(self, ints):
+        """
+        Append the clauses of a 0-terminated sequence of DIMACS literals and
+        return the literals after the last 0. Repeated literals are dropped.
+
+        Clause boundaries, the repeated-literal check and the buffer copy run as
+        C-level iterator pipelines rather than a Python loop per clause.
+        """
+        ends = list(compress(count(), map(not_, ints)))
+        if not ends:
+            return ints
+        start = ends[-1] + 1
+        rest = ints[start:]
+        codes = array("i", [(l << 1) if l >= 0 else ((-l << 1) | 1) for l in ints[:start]])
+        var = max(codes) >> 1
+        if var > self.num_vars:
+            self.num_vars = var
+        starts = [0]
+        starts.extend(map(add, ends[:-1], repeat(1)))
+        lengths = list(map(sub, ends, starts))
+        sizes = list(map(len, map(set, map(codes.__getitem__, map(slice, starts, ends)))))
+        if sizes != lengths:
+            # Blank out repeated literals; they are dropped with the clause separators
+            for i in compress(count(), map(ne, sizes, lengths)):
+                seen = set()
+                for k in range(starts[i], ends[i]):
+                    if codes[k] in seen:
+                        codes[k] = 0
+                    else:
+                        seen.add(codes[k])
+        self.literals.extend(array("i", filter(None, codes)))
+        self.offsets.extend(array("i", accumulate(sizes, initial=self.offsets[-1]))[1:])
+        return rest
+
+    @classmethod
+    def from_buffer(cls, buffer, num_literals, num_offsets, num_vars):
+        """
+        Build a database over a buffer holding the literal words followed by the
+        offset words, without copying. The literal and offset buffers are
+        memoryviews, so clauses cannot be added to it.
+        """
+        words = memoryview(buffer)[:4 * (num_literals + num_offsets)].cast("i")
+        db = cls(num_vars=num_vars)
+        db.literals = words[:num_literals]
+        db.offsets = words[num_literals:]
+        return db
+
+    def share(self):
+        """
+        Copy the buffers into a new shared memory block for `from_buffer`.
+        Returns the block and the (name, num_literals, num_offsets, num_vars)
+        arguments another process needs to attach to it.
+        """
+        literals = self.literals.tobytes()
+        offsets = self.offsets.tobytes()
+        shm = SharedMemory(create=True, size=max(1, len(literals) + len(offsets)))
+        shm.buf[:len(literals)] = literals
+        shm.buf[len(literals):len(literals) + len(offsets)] = offsets
+        return shm, (shm.name, len(self.literals), len(self.offsets), self.num_vars)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("clause index out of range")
+        return Clause(self, index)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield Clause(self, index)
+
+    def clause_lists(self):
+        """
+        Yield every clause as a list of DIMACS literals, decoding the buffer in one pass.
+        """
+        decoded = [-(code >> 1) if code & 1 else code >> 1 for code in self.literals]
+        offsets = self.offsets
+        for index in range(len(self)):
+            yield decoded[offsets[index]:offsets[index + 1]]
+
+    def nbytes(self):
+        """
+        Return the size of the literal and offset buffers in bytes.
+        """
+        return (len(self.literals) * self.literals.itemsize
+                + len(self.offsets) * self.offsets.itemsize)
@@ -0,0 +1,62 @@
+class UnionFind:
+    """
+    Disjoint sets of variables with path halving and union by size.
+    Variables are added on first use.
+    """
+
+    def __init__(self):
+        self.parent = {}
+        self.size = {}
+
+    def find(self, var):
+        parent = self.parent
+        if var not in parent:
+            parent[var] = var
+            self.size[var] = 1
+            return var
+        while parent[var] != var:
+            parent[var] = parent[parent[var]]
+            var = parent[var]
+        return var
+
+    def union(self, a, b):
+        a, b = self.find(a), self.find(b)
+        if a == b:
+            return a
+        if self.size[a] < self.size[b]:
+            a, b = b, a
+        self.parent[b] = a
+        self.size[a] += self.size[b]
+        return a
+
+
+def split_components(clauses):
+    """
+    Split the clauses into variable-disjoint components: two clauses are in
+    the same component if they are linked by a chain of clauses sharing
+    variables. Returns the components as lists of clauses, smallest first, so
+    a refutable small component is found before the large ones are searched.
+    An empty clause forms a component of its own and comes first.
+    """
+    clauses = list(clauses)
+    sets = UnionFind()
+    for clause in clauses:
+        first = None
+        for lit in clause:
+            if first is None:
+                first = sets.find(abs(lit))
+            else:
+                first = sets.union(first, abs(lit))
+    groups = {}
+    empty = []
+    for clause in clauses:
+        for lit in clause:
+            groups.setdefault(sets.find(abs(lit)), []).append(clause)
+            break
+        else:
+            empty.append([clause])
+    return empty + sorted(groups.values(), key=len)
+
+
+def component_variables(component):
+    return {abs(lit) for clause in component for lit in clause}
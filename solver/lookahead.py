@@ -0,0 +1,118 @@
+from collections import Counter
+
+
+class Lookahead:
+    """
+    Unit propagation lookahead for the UP, GUP and SUP heuristics, run on the
+    trail of a `WatchedPropagator`.
+
+    A candidate literal is probed by assigning it on a new decision level,
+    propagating and backtracking, so the clauses are never copied. Its score is
+    the number of literals the probe removes from residual clauses that stay
+    unsatisfied, or infinity if the probe satisfies every residual clause.
+
+    A probe that ends in a conflict is a failed literal: its negation is
+    asserted on the current level right away and probing continues. The
+    implications of every probe are cached with the trail length they were
+    computed at. They stay valid in descendant and sibling nodes, so a cached
+    implication that became False marks a failed literal without probing.
+    `rollback` drops the entries computed above the trail length the search
+    backtracks to, which must happen before the propagator backtracks.
+
+    UP and GUP probe at most `max_candidates` literals, preferring the ones
+    that occur most often in the residual formula; None probes all of them.
+    """
+
+    METHODS = ("UP", "GUP", "SUP")
+    MAX_CANDIDATES = 20
+
+    def __init__(self, propagator, max_candidates=MAX_CANDIDATES):
+        self.propagator = propagator
+        self.max_candidates = max_candidates
+        self.implied = {}  # literal -> (trail length of the probe, implied literals)
+        self.probes = 0
+        self.failed = 0
+
+    def rollback(self, trail_len):
+        """
+        Forget the implications computed with more than `trail_len` assignments on the trail.
+        """
+        self.implied = {l: entry for l, entry in self.implied.items() if entry[0] <= trail_len}
+
+    def probe(self, literal):
+        """
+        Return the literals implied by `literal`, including itself, or None if it fails.
+        """
+        propagator = self.propagator
+        cached = self.implied.get(literal)
+        if cached is not None and any(propagator.value(l) < 0 for l in cached[1]):
+            return None
+        start = len(propagator.trail)
+        propagator.new_level()
+        propagator.assign(literal)
+        conflict = propagator.propagate()
+        implied = propagator.trail[start:]
+        propagator.backtrack(propagator.decision_level - 1)
+        self.probes += 1
+        if conflict is not None:
+            return None
+        self.implied[literal] = (start, implied)
+        return implied
+
+    def preselect(self, clauses):
+        """
+        Return the literals of `clauses` by decreasing occurrence count, at most `max_candidates` of them.
+        """
+        counts = Counter(l for clause in clauses for l in clause)
+        ranked = sorted(counts, key=lambda l: (-counts[l], abs(l), -l))
+        return ranked[:self.max_candidates] if self.max_candidates else ranked
+
+    def select(self, clauses, method="UP", candidates=None, indentation="", verbose=False):
+        """
+        Return the best scoring literal among `candidates` (by default the
+        preselected literals of the residual `clauses`). GUP returns the first
+        literal that satisfies every clause.
+
+        Negations of failed literals are asserted on the propagator, in which
+        case the caller must propagate and select again since `clauses` is no
+        longer the residual formula. Returns None if asserting one of them
+        leads to a conflict, which refutes the current node.
+        """
+        propagator = self.propagator
+        occurs = {}
+        for index, clause in enumerate(clauses):
+            for l in clause:
+                occurs.setdefault(l, []).append(index)
+
+        best_literal = None
+        best_score = -1
+        if candidates is None:
+            candidates = self.preselect(clauses)
+        for literal in candidates:
+            if propagator.value(literal):
+                continue
+            implied = self.probe(literal)
+            if implied is None:
+                self.failed += 1
+                if verbose:
+                    print(f"{indentation}Failed literal {literal}, asserting {-literal}")
+                propagator.assign(-literal)
+                if propagator.propagate() is not None:
+                    return None
+                continue
+            satisfied = set()
+            for l in implied:
+                satisfied.update(occurs.get(l, ()))
+            if len(satisfied) == len(clauses):
+                score = float("inf")
+            else:
+                score = sum(1 for l in implied for index in occurs.get(-l, ()) if index not in satisfied)
+            if method == "GUP" and score == float("inf"):
+                return literal
+            if score > best_score:
+                best_score = score
+                best_literal = literal
+        if best_literal is None:
+            # Every candidate was assigned by failed-literal assertions
+            return next(iter(clauses[0]))
+        return best_literal
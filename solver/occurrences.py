@@ -0,0 +1,145 @@
+from solver.utils import best_scoring_literal
+
+
+class OccurrenceIndex:
+    """
+    Literal occurrence statistics of the residual formula, kept in sync with the
+    trail of a `WatchedPropagator`.
+
+    For every literal it stores the number of unsatisfied clauses it occurs in,
+    the same count bucketed by the current clause length (for MOMS/MAMS) and the
+    Jeroslow-Wang weight. JW weights are kept as exact integers scaled by
+    2 ** max_len, so `2 ** (max_len - size)` stands for `2 ** -size`.
+
+    `sync` applies the trail assignments made since the last call and `rollback`
+    reverts them, which must happen before the propagator backtracks. Only the
+    clauses containing an assigned variable are visited.
+
+    Selections break ties with `utils.best_scoring_literal`, like the
+    clause-scanning heuristics, so both make the same branching decisions.
+    """
+
+    METHODS = ("MAXO", "MOMS", "MAMS", "JW")
+
+    def __init__(self, propagator):
+        self.propagator = propagator
+        num_vars = propagator.num_vars
+        clauses = propagator.clauses
+        self.max_len = max((len(c) for c in clauses if c is not None), default=0)
+        self.occurrences = [[] for _ in range(2 * num_vars + 1)]
+        self.assigned = [False] * (num_vars + 1)
+        self.satisfier = [0] * len(clauses)
+        self.size = [len(c) if c is not None else 0 for c in clauses]
+        self.count = [0] * (2 * num_vars + 1)
+        self.jw = [0] * (2 * num_vars + 1)
+        self.size_count = [0] * (self.max_len + 1)
+        self.buckets = [{} for _ in range(self.max_len + 1)]
+        self.active = 0
+        self.processed = 0
+        for index, clause in enumerate(clauses):
+            if clause is None:
+                continue
+            for lit in clause:
+                self.occurrences[lit].append(index)
+            self._add(index, len(clause))
+            self.active += 1
+
+    def _add(self, index, size, skip=0):
+        count, jw, bucket, assigned = self.count, self.jw, self.buckets[size], self.assigned
+        weight = 1 << (self.max_len - size)
+        for lit in self.propagator.clauses[index]:
+            if not assigned[abs(lit)] and lit != skip:
+                count[lit] += 1
+                jw[lit] += weight
+                bucket[lit] = bucket.get(lit, 0) + 1
+        self.size_count[size] += 1
+
+    def _remove(self, index, size, skip=0):
+        count, jw, bucket, assigned = self.count, self.jw, self.buckets[size], self.assigned
+        weight = 1 << (self.max_len - size)
+        for lit in self.propagator.clauses[index]:
+            if not assigned[abs(lit)] and lit != skip:
+                count[lit] -= 1
+                jw[lit] -= weight
+                if bucket[lit] == 1:
+                    del bucket[lit]
+                else:
+                    bucket[lit] -= 1
+        self.size_count[size] -= 1
+
+    def sync(self):
+        """
+        Apply the trail assignments that have not been applied yet.
+        """
+        trail = self.propagator.trail
+        satisfier, size, occurrences = self.satisfier, self.size, self.occurrences
+        while self.processed < len(trail):
+            literal = trail[self.processed]
+            self.processed += 1
+            for index in occurrences[literal]:
+                if not satisfier[index]:
+                    satisfier[index] = literal
+                    self._remove(index, size[index])
+                    self.active -= 1
+            for index in occurrences[-literal]:
+                if not satisfier[index]:
+                    self._remove(index, size[index])
+                    size[index] -= 1
+                    self._add(index, size[index], skip=-literal)
+            self.assigned[abs(literal)] = True
+
+    def rollback(self, trail_size):
+        """
+        Revert applied assignments until only the first `trail_size` trail entries remain.
+        """
+        trail = self.propagator.trail
+        satisfier, size, occurrences = self.satisfier, self.size, self.occurrences
+        while self.processed > trail_size:
+            self.processed -= 1
+            literal = trail[self.processed]
+            self.assigned[abs(literal)] = False
+            for index in occurrences[-literal]:
+                if not satisfier[index]:
+                    self._remove(index, size[index], skip=-literal)
+                    size[index] += 1
+                    self._add(index, size[index])
+            for index in occurrences[literal]:
+                if satisfier[index] == literal:
+                    satisfier[index] = 0
+                    self._add(index, size[index])
+                    self.active += 1
+
+    def literals(self):
+        """
+        Return the literals occurring in the residual formula.
+        """
+        count = self.count
+        return [l for v in range(1, self.propagator.num_vars + 1) for l in (v, -v) if count[l]]
+
+    def pure_literals(self):
+        count = self.count
+        return [l for l in self.literals() if not count[-l]]
+
+    def min_size(self):
+        return next((k for k in range(1, self.max_len + 1) if self.size_count[k]), None)
+
+    def select(self, method):
+        """
+        Select a branching literal with MAXO, MOMS, MAMS or JW from the index.
+        """
+        if not self.active:
+            return None
+        if method == "MOMS":
+            bucket = self.buckets[self.min_size()]
+            return best_scoring_literal(bucket, bucket)
+        literals = self.literals()
+        if method == "MAXO":
+            scores = self.count
+        elif method == "JW":
+            scores = self.jw
+        elif method == "MAMS":
+            bucket = self.buckets[self.min_size()]
+            scores = {l: self.count[l] + bucket.get(-l, 0) for l in literals}
+        else:
+            raise ValueError(f"Unknown selection method: {method}")
+        return best_scoring_literal(literals, scores)
@@ -1,44 +1,208 @@
-def parse_dimacs_cnf(file_path):
+import bz2
+import gzip
+import lzma
+import re
+from array import array
+from solver.clausedb import ClauseDB
+from solver.cache import default_cache
+from solver.cardinality import at_least
+
+# Openers for compressed inputs, chosen by file suffix
+COMPRESSED_OPENERS = {".gz": gzip.open, ".xz": lzma.open, ".lzma": lzma.open, ".bz2": bz2.open}
+
+CHUNK_SIZE = 1 << 20
+
+# Lines that are not part of the clause token stream: comments, the problem line
+# and the SATLIB '%' end marker
+_COMMENT_OR_PROBLEM_LINE = re.compile(rb"^[ \t]*[cp].*$", re.MULTILINE)
+_PROBLEM_LINE = re.compile(rb"^[ \t]*p[ \t]+cnf[ \t]+(\d+)[ \t]+(\d+)", re.MULTILINE)
+_END_MARKER = re.compile(rb"^[ \t]*%", re.MULTILINE)
+
+
+def open_cnf(file_path):
+    """
+    Open a CNF file for binary reading, decompressing .gz, .xz/.lzma and .bz2 files on the fly.
+    """
+    for suffix, opener in COMPRESSED_OPENERS.items():
+        if str(file_path).endswith(suffix):
+            return opener(file_path, "rb")
+    return open(file_path, "rb")
+
+
+def iter_dimacs_tokens(f, header):
+    """
+    Yield the clause section of a DIMACS file as blocks of integers.
+
+    The file is read in chunks of whole lines and each chunk is split on
+    whitespace at once, so clauses may wrap across lines or share a line.
+    Comment lines are dropped, the problem line is stored in `header` as
+    [num_vars, num_clauses] and reading stops at a SATLIB '%' end marker.
+    """
+    carry = b""
+    while True:
+        chunk = f.read(CHUNK_SIZE)
+        last = not chunk
+        block = carry + chunk
+        if not last:
+            cut = block.rfind(b"\n") + 1
+            block, carry = block[:cut], block[cut:]
+        if b"c" in block or b"p" in block or b"%" in block:
+            end = _END_MARKER.search(block)
+            if end:
+                block = block[:end.start()]
+                last = True
+            if not header:
+                problem = _PROBLEM_LINE.search(block)
+                if problem:
+                    header.extend(map(int, problem.groups()))
+            block = _COMMENT_OR_PROBLEM_LINE.sub(b"", block)
+        tokens = block.split()
+        try:
+            yield array("i", map(int, tokens))
+        except ValueError:
+            ints = array("i")
+            for token in tokens:
+                try:
+                    ints.append(int(token))
+                except ValueError:
+                    print(f"Warning: Invalid token in file: {token.decode(errors='replace')}")
+            yield ints
+        if last:
+            return
+
+
+def parse_dimacs_cnf(file_path, compact=False, cache=None):
     """
     Parse a DIMACS CNF file to extract the problem variables and clauses.
 
+    The clause section is read as one stream of whitespace-separated integers
+    in which 0 ends a clause, so clauses may span several lines. Files ending in
+    .gz, .xz or .bz2 are decompressed while reading. Repeated literals in a
+    clause are dropped.
+
+    With an `InstanceCache` the parsed instance is loaded from, or stored to,
+    the cache. By default the cache named by SAT_SOLVER_CACHE_DIR is used if
+    that variable is set; pass cache=False to always parse the file.
+
     Args:
     - file_path (str): The path to the DIMACS CNF file.
+    - compact (bool): Store the clauses in a ClauseDB instead of a list of sets.
+    - cache (InstanceCache, None or False): The parsed-instance cache to use.
 
     Returns:
     - num_vars (int): Number of variables in the CNF formula.
     - num_clauses (int): Number of clauses in the CNF formula.
-    - clauses (list of sets): A list of sets, each containing the literals in the corresponding clause.
+    - clauses (list of sets or ClauseDB): The literals of each clause.
+
+    Raises ValueError for a "cnf+" file, whose constraints need `parse_cardinality_cnf`.
     """
-    num_vars = 0
-    num_clauses = 0
-    clauses = []
+    if cache is None:
+        cache = default_cache()
+    if cache:
+        cached = cache.load(file_path)
+        if cached is None:
+            cached = parse_dimacs_cnf(file_path, compact=True, cache=False)
+            cache.store(file_path, *cached)
+        num_vars, num_clauses, clauses = cached
+        if not compact:
+            clauses = [set(clause) for clause in clauses.clause_lists()]
+        return num_vars, num_clauses, clauses
+
+    if is_cardinality_cnf(file_path):
+        raise ValueError(f"{file_path} has cardinality constraints (p cnf+); parse it with parse_cardinality_cnf")
+    header = []
+    clauses = ClauseDB() if compact else []
 
-    with open(file_path, 'r') as f:
+    current = array("i")  # literals of a clause that continues into the next block
+    with open_cnf(file_path) as f:
+        for ints in iter_dimacs_tokens(f, header):
+            if current:
+                ints = current + ints
+            if compact:
+                current = clauses.add_dimacs(ints)
+                continue
+            find_zero = ints.index
+            start = 0
+            while True:
+                try:
+                    end = find_zero(0, start)
+                except ValueError:
+                    break
+                clauses.append(set(ints[start:end]))
+                start = end + 1
+            current = ints[start:]
+    # Accept a last clause that is missing its terminating 0
+    if current:
+        if compact:
+            clauses.add_clause(set(current))
+        else:
+            clauses.append(set(current))
+
+    num_vars, num_clauses = header if header else (0, 0)
+    if compact:
+        clauses.num_vars = max(clauses.num_vars, num_vars)
+    return num_vars, num_clauses, clauses
+
+
+def is_cardinality_cnf(file_path):
+    """
+    Check whether the problem line of a file declares the "cnf+" format.
+    """
+    with open_cnf(file_path) as f:
         for line in f:
             line = line.strip()
+            if line.startswith(b"p"):
+                return line.split()[1:2] == [b"cnf+"]
+            if line and not line.startswith(b"c"):
+                return False
+    return False
 
-            # Skip comments (lines starting with 'c')
-            if line.startswith('c') or line.startswith('%') or line.startswith('0'):
-                continue
 
-            # Problem line starts with 'p', e.g., 'p cnf 20 91'
-            if line.startswith('p'):
-                _, _, num_vars, num_clauses = line.split()
-                num_vars = int(num_vars)
-                num_clauses = int(num_clauses)
-                continue
+def parse_cardinality_cnf(file_path):
+    """
+    Parse a DIMACS file in the "cnf+" format, which extends CNF with
+    cardinality constraints written as a literal list followed by "<= k" or
+    ">= k" on one line, e.g. "1 2 3 <= 1". Plain CNF files are accepted too.
 
-            # Process clauses (lines containing integers, e.g., '13 15 -5 0')
-            try:
-                clause = set(map(int, line.split()))  # Convert to integers and store as a set
-                # Ensure the clause ends with 0, which is the delimiter in DIMACS format
-                if 0 in clause:
-                    clause.remove(0)  # Remove the trailing 0
-                    clauses.append(clause)
-            except ValueError:
-                print(f"Warning: Invalid clause line format in file: {line}")
-    return num_vars, num_clauses, clauses
+    The file is read line by line, so it is slower than `parse_dimacs_cnf`
+    on large plain CNF files.
+
+    Returns:
+    - num_vars (int): Number of variables in the formula.
+    - num_clauses (int): Number of clauses and constraints declared in the header.
+    - clauses (list of sets): The literals of each clause.
+    - constraints (list of (list of int, int)): At-most-k constraints as (literals, k);
+      ">= k" constraints are stored as at most len(literals) - k of the negated literals.
+    """
+    header = (0, 0)
+    clauses = []
+    constraints = []
+    current = []
+    with open_cnf(file_path) as f:
+        for line in f:
+            tokens = line.split()
+            if not tokens or tokens[0].startswith(b"c"):
+                continue
+            if tokens[0] == b"%":
+                break
+            if tokens[0] == b"p":
+                header = (int(tokens[2]), int(tokens[3]))
+                continue
+            if tokens[-2:-1] in ([b"<="], [b">="]):
+                literals = [int(token) for token in tokens[:-2]]
+                bound = int(tokens[-1])
+                constraints.append((literals, bound) if tokens[-2] == b"<=" else at_least(literals, bound))
+                continue
+            for token in tokens:
+                literal = int(token)
+                if literal:
+                    current.append(literal)
+                else:
+                    clauses.append(set(current))
+                    current = []
+    if current:
+        clauses.append(set(current))
+    return header[0], header[1], clauses, constraints
 
 
 def convert_clauses_to_solver_format(clauses):
@@ -47,11 +211,14 @@ def convert_clauses_to_solver_format(clauses):
     The format is a list of sets, where each set represents a clause.
 
     Args:
-    - clauses (list of sets): The clauses parsed from a DIMACS CNF file.
+    - clauses (list of sets or ClauseDB): The clauses parsed from a DIMACS CNF file.
 
     Returns:
     - solver_clauses (list of sets): A list of sets representing the clauses in the format used by the solver.
     """
+    if isinstance(clauses, ClauseDB):
+        return clauses
+
     solver_clauses = []
 
     for clause in clauses:
@@ -0,0 +1,290 @@
+import time
+from solver.clausedb import ClauseDB
+from solver.propagation import WatchedPropagator
+
+TECHNIQUES = ("subsumption", "probing", "elimination")
+
+
+def signature(clause):
+    """
+    Return a 64-bit variable signature: C can only subsume D if sig(C) & ~sig(D) == 0.
+    """
+    sig = 0
+    for lit in clause:
+        sig |= 1 << (abs(lit) & 63)
+    return sig
+
+
+class Preprocessor:
+    """
+    Formula simplification before the search.
+
+    Clauses are kept with occurrence lists per literal. `run` applies root
+    unit propagation and then, in order, each technique named in `techniques`:
+
+    - "subsumption": backward subsumption and self-subsuming strengthening,
+      filtered by 64-bit clause signatures. At most `subsumption_limit`
+      candidate clauses are checked.
+    - "probing": failed-literal probing on a `WatchedPropagator`. A literal
+      whose assignment leads to a conflict is fixed to False. At most
+      `probe_limit` variables are probed.
+    - "elimination": SatELite-style bounded variable elimination, cheapest
+      |pos| x |neg| first. A variable is eliminated only if its non-tautological
+      resolvents are no more numerous than the clauses they replace and none is
+      longer than `max_resolvent_size`. At most `elimination_limit`
+      resolutions are done.
+
+    Eliminated variables and their clauses are kept on a stack so
+    `reconstruct` can extend a model of the simplified formula to the original
+    one. `stats` holds, per technique, the clauses, variables and literals it
+    removed and the time it took.
+
+    `effort` scales the three limits at once: 0.5 halves the work each
+    technique may do and 10 allows ten times as much.
+    """
+
+    def __init__(self, clauses, techniques=TECHNIQUES, subsumption_limit=10 ** 6, probe_limit=2000,
+                 elimination_limit=10 ** 6, max_resolvent_size=16, effort=1.0, verbose=False):
+        if isinstance(clauses, ClauseDB):
+            clauses = clauses.clause_lists()
+        self.techniques = techniques
+        self.subsumption_limit = int(subsumption_limit * effort)
+        self.probe_limit = int(probe_limit * effort)
+        self.elimination_limit = int(elimination_limit * effort)
+        self.max_resolvent_size = max_resolvent_size
+        self.verbose = verbose
+        self.clauses = []
+        self.signatures = []
+        self.occurs = {}
+        self.units = []
+        self.fixed = {}  # var -> value of variables fixed at the root
+        self.eliminated = []  # (var, clauses containing var) in elimination order
+        self.unsat = False
+        self.stats = {}
+        self.num_vars = 0
+        for clause in clauses:
+            clause = frozenset(clause)
+            self.num_vars = max(self.num_vars, max((abs(l) for l in clause), default=0))
+            # Tautologies are always satisfied
+            if not any(-l in clause for l in clause):
+                self._add(clause)
+
+    def _add(self, clause):
+        index = len(self.clauses)
+        self.clauses.append(clause)
+        self.signatures.append(signature(clause))
+        for lit in clause:
+            self.occurs.setdefault(lit, set()).add(index)
+        if len(clause) == 1:
+            self.units.extend(clause)
+        elif not clause:
+            self.unsat = True
+        return index
+
+    def _remove(self, index):
+        for lit in self.clauses[index]:
+            self.occurs[lit].discard(index)
+        self.clauses[index] = None
+
+    def _strengthen(self, index, lit):
+        """
+        Remove a literal from a clause.
+        """
+        clause = self.clauses[index] - {lit}
+        self.occurs[lit].discard(index)
+        self.clauses[index] = clause
+        self.signatures[index] = signature(clause)
+        if len(clause) == 1:
+            self.units.extend(clause)
+        elif not clause:
+            self.unsat = True
+
+    def _propagate(self):
+        """
+        Fix every pending unit literal, removing satisfied clauses and false literals.
+        """
+        while self.units and not self.unsat:
+            lit = self.units.pop()
+            var = abs(lit)
+            if var in self.fixed:
+                if self.fixed[var] != (lit > 0):
+                    self.unsat = True
+                continue
+            self.fixed[var] = lit > 0
+            for index in list(self.occurs.get(lit, ())):
+                self._remove(index)
+            for index in list(self.occurs.get(-lit, ())):
+                self._strengthen(index, -lit)
+
+    def active_clauses(self):
+        return [clause for clause in self.clauses if clause is not None]
+
+    def active_vars(self):
+        return {abs(lit) for lit, indices in self.occurs.items() if indices}
+
+    def subsume(self):
+        """
+        Backward subsumption and self-subsuming strengthening, shortest clauses first.
+        Returns the number of subsumed clauses and of strengthened literals.
+        """
+        clauses, signatures, occurs = self.clauses, self.signatures, self.occurs
+        queue = sorted((i for i, c in enumerate(clauses) if c is not None), key=lambda i: -len(clauses[i]))
+        queued = set(queue)
+        checks = removed = strengthened = 0
+        while queue and checks < self.subsumption_limit and not self.unsat:
+            i = queue.pop()
+            queued.discard(i)
+            clause = clauses[i]
+            if clause is None or not clause:
+                continue
+            sig = signatures[i]
+            # Subsumption: every clause subsumed by `clause` contains its rarest literal
+            best = min(clause, key=lambda l: len(occurs[l]))
+            for j in list(occurs[best]):
+                checks += 1
+                other = clauses[j]
+                if j != i and len(other) >= len(clause) and not sig & ~signatures[j] and clause <= other:
+                    self._remove(j)
+                    removed += 1
+            # Self-subsuming resolution: (clause - {l}) | {-l} subsumes D, so -l can be dropped from D
+            for lit in clause:
+                rest = clause - {lit}
+                for j in list(occurs.get(-lit, ())):
+                    checks += 1
+                    other = clauses[j]
+                    if len(other) >= len(clause) and not sig & ~signatures[j] and rest <= other:
+                        self._strengthen(j, -lit)
+                        strengthened += 1
+                        if j not in queued:
+                            queue.append(j)
+                            queued.add(j)
+            self._propagate()
+        return removed, strengthened
+
+    def probe(self):
+        """
+        Failed-literal probing. Returns the number of failed literals found.
+        """
+        propagator = WatchedPropagator(self.active_clauses(), num_vars=self.num_vars)
+        if propagator.propagate() is not None:
+            self.unsat = True
+            return 0
+        occurs = self.occurs
+        candidates = sorted(self.active_vars(),
+                            key=lambda v: -(len(occurs.get(v, ())) + len(occurs.get(-v, ()))))
+        failed = 0
+        for var in candidates[:self.probe_limit]:
+            for lit in (var, -var):
+                if propagator.values[var]:
+                    break
+                propagator.new_level()
+                propagator.assign(lit)
+                conflict = propagator.propagate()
+                propagator.backtrack(0)
+                if conflict is not None:
+                    failed += 1
+                    propagator.assign(-lit)
+                    if propagator.propagate() is not None:
+                        self.unsat = True
+                        return failed
+        self.units.extend(propagator.trail)
+        self._propagate()
+        return failed
+
+    def _resolvents(self, var, pos, neg):
+        """
+        Return the non-tautological resolvents on `var`, or None if they exceed
+        the elimination bounds.
+        """
+        limit = len(pos) + len(neg)
+        resolvents = set()
+        for p in pos:
+            p = p - {var}
+            for n in neg:
+                resolvent = p | (n - {-var})
+                if any(-l in resolvent for l in resolvent):
+                    continue
+                if len(resolvent) > self.max_resolvent_size:
+                    return None
+                resolvents.add(resolvent)
+                if len(resolvents) > limit:
+                    return None
+        return resolvents
+
+    def eliminate(self):
+        """
+        Bounded variable elimination. Returns the number of eliminated variables.
+        """
+        occurs, clauses = self.occurs, self.clauses
+        candidates = sorted(self.active_vars(),
+                            key=lambda v: len(occurs.get(v, ())) * len(occurs.get(-v, ())))
+        resolutions = eliminated = 0
+        for var in candidates:
+            if self.unsat or resolutions >= self.elimination_limit:
+                break
+            if var in self.fixed:
+                continue
+            pos = [clauses[i] for i in occurs.get(var, ())]
+            neg = [clauses[i] for i in occurs.get(-var, ())]
+            if not pos and not neg:
+                continue
+            resolvents = self._resolvents(var, pos, neg)
+            resolutions += len(pos) * len(neg)
+            if resolvents is None:
+                continue
+            self.eliminated.append((var, pos + neg))
+            for index in list(occurs.get(var, ())) + list(occurs.get(-var, ())):
+                self._remove(index)
+            for resolvent in resolvents:
+                self._add(resolvent)
+            self._propagate()
+            eliminated += 1
+        return eliminated
+
+    def run(self):
+        """
+        Simplify the formula. Returns the remaining clauses as lists of
+        literals, or None if the formula was found unsatisfiable.
+        """
+        methods = {"subsumption": self.subsume, "probing": self.probe, "elimination": self.eliminate}
+        steps = [("units", lambda: None)] + [(name, methods[name]) for name in self.techniques]
+        for name, step in steps:
+            clauses = len(self.active_clauses())
+            variables = len(self.active_vars())
+            literals = sum(len(c) for c in self.active_clauses())
+            start = time.perf_counter()
+            step()
+            self._propagate()
+            remaining = self.active_clauses()
+            self.stats[name] = {
+                "clauses_removed": clauses - len(remaining),
+                "variables_removed": variables - len(self.active_vars()),
+                "literals_removed": literals - sum(len(c) for c in remaining),
+                "time": time.perf_counter() - start,
+            }
+            if self.verbose:
+                stats = self.stats[name]
+                print(f"Preprocessing {name}: removed {stats['clauses_removed']} clauses, "
+                      f"{stats['variables_removed']} variables, {stats['literals_removed']} literals "
+                      f"in {stats['time']:.4f} seconds")
+            if self.unsat:
+                if self.verbose:
+                    print("Preprocessing found the formula unsatisfiable")
+                return None
+        return [list(clause) for clause in self.active_clauses()]
+
+    def reconstruct(self, model):
+        """
+        Extend a model of the simplified formula, given as true DIMACS literals,
+        to a model of the original formula. Returns one literal per variable.
+        """
+        values = {abs(lit): lit > 0 for lit in model}
+        values.update(self.fixed)
+        for var, clauses in reversed(self.eliminated):
+            values[var] = False
+            for clause in clauses:
+                if var in clause and not any(values.get(abs(l), False) == (l > 0) for l in clause if l != var):
+                    values[var] = True
+                    break
+        return [v if values.get(v, False) else -v for v in range(1, self.num_vars + 1)]
+
@@ -0,0 +1,229 @@
+from solver.clausedb import ClauseDB
+
+
+class WatchedPropagator:
+    """
+    Unit propagation engine based on two watched literals.
+
+    Clauses are copied once into lists whose first two positions are the watched
+    literals. Assigning a literal only visits the clauses watching its negation,
+    so propagation never rebuilds or copies the clause list.
+
+    Literals use the DIMACS convention (signed integers) and a clause must not
+    repeat a literal. `clauses` may be any iterable of clauses or a `ClauseDB`,
+    which is decoded straight from its literal buffer. Watch lists are indexed
+    directly by the literal: negative literals index from the end of the list.
+    """
+
+    def __init__(self, clauses, num_vars=None):
+        if isinstance(clauses, ClauseDB):
+            if num_vars is None:
+                num_vars = clauses.num_vars
+            clauses = clauses.clause_lists()
+        else:
+            clauses = list(clauses)
+        if num_vars is None:
+            num_vars = max((abs(l) for clause in clauses for l in clause), default=0)
+        self.num_vars = num_vars
+        self.clauses = []
+        self.watches = [[] for _ in range(2 * num_vars + 1)]
+        self.values = [0] * (num_vars + 1)   # 1 = True, -1 = False, 0 = unassigned
+        self.levels = [0] * (num_vars + 1)
+        self.reasons = [None] * (num_vars + 1)
+        self.trail = []
+        self.trail_lim = []
+        self.head = 0
+        self.conflict = None
+        watches = self.watches
+        for clause in clauses:
+            if len(clause) < 2:
+                self.add_clause(clause)
+                continue
+            clause = list(clause)
+            index = len(self.clauses)
+            self.clauses.append(clause)
+            watches[clause[0]].append(index)
+            watches[clause[1]].append(index)
+
+    @property
+    def decision_level(self):
+        return len(self.trail_lim)
+
+    def value(self, literal):
+        """
+        Return 1 if the literal is True, -1 if it is False and 0 if unassigned.
+        """
+        value = self.values[abs(literal)]
+        return value if literal > 0 else -value
+
+    def add_clause(self, clause):
+        """
+        Add a clause and watch its first two literals. Returns the clause index.
+
+        Empty clauses and unit clauses falsified at the root are recorded in
+        `conflict`; other unit clauses are enqueued for propagation.
+        """
+        index = len(self.clauses)
+        clause = list(clause)
+        self.clauses.append(clause)
+        if not clause:
+            if self.conflict is None:
+                self.conflict = index
+        elif len(clause) == 1:
+            if not self.assign(clause[0], index) and self.conflict is None:
+                self.conflict = index
+        else:
+            self.watches[clause[0]].append(index)
+            self.watches[clause[1]].append(index)
+        return index
+
+    def add_variables(self, num_vars):
+        """
+        Grow the variable range to `num_vars`. The per-variable lists are resized
+        in place, so references held by heuristics stay valid.
+        """
+        extra = num_vars - self.num_vars
+        if extra <= 0:
+            return
+        # Negative literals index from the end: inserting the new lists in the
+        # middle moves every old negative list to its new index
+        self.watches[self.num_vars + 1:self.num_vars + 1] = [[] for _ in range(2 * extra)]
+        self.values.extend([0] * extra)
+        self.levels.extend([0] * extra)
+        self.reasons.extend([None] * extra)
+        self.num_vars = num_vars
+
+    def new_level(self):
+        self.trail_lim.append(len(self.trail))
+
+    def assign(self, literal, reason=None):
+        """
+        Make `literal` True at the current decision level.
+        Returns False if the literal is already False.
+        """
+        var = abs(literal)
+        value = self.values[var]
+        if value:
+            return (value > 0) == (literal > 0)
+        self.values[var] = 1 if literal > 0 else -1
+        self.levels[var] = len(self.trail_lim)
+        self.reasons[var] = reason
+        self.trail.append(literal)
+        return True
+
+    def propagate(self):
+        """
+        Propagate every assignment on the trail that has not been processed yet.
+        Returns the index of a conflicting clause, or None if no conflict occurred.
+        """
+        if self.conflict is not None:
+            return self.conflict
+        trail = self.trail
+        values = self.values
+        clauses = self.clauses
+        watches = self.watches
+        while self.head < len(trail):
+            false_lit = -trail[self.head]
+            self.head += 1
+            watching = watches[false_lit]
+            i = j = 0
+            n = len(watching)
+            while i < n:
+                index = watching[i]
+                i += 1
+                clause = clauses[index]
+                if clause[0] == false_lit:
+                    clause[0], clause[1] = clause[1], false_lit
+                first = clause[0]
+                first_value = values[abs(first)]
+                if first_value and (first_value > 0) == (first > 0):
+                    watching[j] = index
+                    j += 1
+                    continue
+                for k in range(2, len(clause)):
+                    lit = clause[k]
+                    lit_value = values[abs(lit)]
+                    if not lit_value or (lit_value > 0) == (lit > 0):
+                        clause[1], clause[k] = lit, false_lit
+                        watches[lit].append(index)
+                        break
+                else:
+                    watching[j] = index
+                    j += 1
+                    if first_value:
+                        # Every literal is False: keep the remaining watches and stop
+                        while i < n:
+                            watching[j] = watching[i]
+                            i += 1
+                            j += 1
+                        del watching[j:]
+                        self.head = len(trail)
+                        return index
+                    self.assign(first, index)
+            del watching[j:]
+        return None
+
+    def backtrack(self, level):
+        """
+        Undo every assignment made above the given decision level.
+        """
+        if level >= len(self.trail_lim):
+            return
+        start = self.trail_lim[level]
+        for literal in self.trail[start:]:
+            var = abs(literal)
+            self.values[var] = 0
+            self.reasons[var] = None
+        del self.trail[start:]
+        del self.trail_lim[level:]
+        self.head = min(self.head, start)
+
+    def remove_clauses(self, indices):
+        """
+        Delete clauses from the database. The indices of the remaining clauses do
+        not change; the removed slots are set to None. A clause that is the reason
+        of a current assignment must not be removed.
+        """
+        indices = set(indices)
+        watched = set()
+        for index in indices:
+            watched.update(self.clauses[index][:2])
+            self.clauses[index] = None
+        for lit in watched:
+            watching = self.watches[lit]
+            watching[:] = [i for i in watching if i not in indices]
+
+    def conflict_literals(self, index):
+        """
+        Return the literals of the clause behind a conflict returned by `propagate`.
+        """
+        return self.clauses[index]
+
+    def is_satisfied(self, index):
+        """
+        Check whether a clause has a True literal under the current assignment.
+        """
+        values = self.values
+        for lit in self.clauses[index]:
+            value = values[abs(lit)]
+            if value and (value > 0) == (lit > 0):
+                return True
+        return False
+
+    def residual_clauses(self):
+        """
+        Yield the unsatisfied clauses restricted to their unassigned literals.
+        """
+        values = self.values
+        for clause in self.clauses:
+            if clause is None:
+                continue
+            remaining = []
+            for lit in clause:
+                value = values[abs(lit)]
+                if not value:
+                    remaining.append(lit)
+                elif (value > 0) == (lit > 0):
+                    break
+            else:
+                yield remaining
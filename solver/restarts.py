@@ -0,0 +1,118 @@
+RESTART_POLICIES = ("luby", "geometric", "glucose")
+
+
+def luby(i):
+    """
+    Return the i-th element (1-based) of the Luby sequence 1 1 2 1 1 2 4 1 1 2 ...
+    """
+    k = 1
+    while (1 << k) - 1 < i:
+        k += 1
+    while i != (1 << k) - 1:
+        i -= (1 << (k - 1)) - 1
+        k = 1
+        while (1 << k) - 1 < i:
+            k += 1
+    return 1 << (k - 1)
+
+
+class LubyRestarts:
+    """
+    Restart after `base` times the next element of the Luby sequence conflicts.
+    """
+
+    def __init__(self, base=100):
+        self.base = base
+        self.restarts = 0
+        self.conflicts = 0
+        self.limit = base * luby(1)
+
+    def conflict(self, depth):
+        """
+        Count a conflict at decision level `depth`. Returns True if the search should restart.
+        """
+        self.conflicts += 1
+        if self.conflicts < self.limit:
+            return False
+        self.restarts += 1
+        self.conflicts = 0
+        self.limit = self.base * luby(self.restarts + 1)
+        return True
+
+
+class GeometricRestarts:
+    """
+    Restart after `base` conflicts, multiplying the budget by `factor` after every restart.
+    """
+
+    def __init__(self, base=100, factor=1.5):
+        self.factor = factor
+        self.restarts = 0
+        self.conflicts = 0
+        self.limit = base
+
+    def conflict(self, depth):
+        self.conflicts += 1
+        if self.conflicts < self.limit:
+            return False
+        self.restarts += 1
+        self.conflicts = 0
+        self.limit *= self.factor
+        return True
+
+
+class GlucoseRestarts:
+    """
+    Glucose-style dynamic restarts.
+
+    Glucose restarts when the average LBD of the last `window` learned clauses
+    exceeds the global average by a factor `margin`. Without learning, the
+    clause refuting a DPLL node is the negation of its decisions, whose LBD is
+    the decision level, so the conflict depth takes its place. At least `base`
+    conflicts separate two restarts and that minimum grows by `growth` after
+    every restart, so the search stays complete.
+    """
+
+    def __init__(self, base=100, window=50, margin=1.25, growth=1.1):
+        self.window = window
+        self.margin = margin
+        self.growth = growth
+        self.restarts = 0
+        self.conflicts = 0
+        self.limit = base
+        self.recent = []
+        self.recent_sum = 0
+        self.total = 0
+        self.count = 0
+
+    def conflict(self, depth):
+        self.conflicts += 1
+        self.total += depth
+        self.count += 1
+        self.recent.append(depth)
+        self.recent_sum += depth
+        if len(self.recent) > self.window:
+            self.recent_sum -= self.recent.pop(0)
+        if self.conflicts < self.limit or len(self.recent) < self.window:
+            return False
+        if self.recent_sum * self.count <= self.margin * self.total * len(self.recent):
+            return False
+        self.restarts += 1
+        self.conflicts = 0
+        self.limit *= self.growth
+        self.recent = []
+        self.recent_sum = 0
+        return True
+
+
+def make_restart_policy(name, base=100):
+    """
+    Return a new restart policy by name: "luby", "geometric" or "glucose".
+    """
+    if name == "luby":
+        return LubyRestarts(base)
+    if name == "geometric":
+        return GeometricRestarts(base)
+    if name == "glucose":
+        return GlucoseRestarts(base)
+    raise ValueError(f"Unknown restart policy: {name}")
@@ -1,39 +1,196 @@
 import argparse
-from solver.parser import parse_dimacs_cnf, convert_clauses_to_solver_format
+import json
+from solver.parser import parse_dimacs_cnf, convert_clauses_to_solver_format, is_cardinality_cnf, parse_cardinality_cnf
 from solver.algorithms.dpll import dpll
+from solver.algorithms.cdcl import cdcl
 from solver.algorithms.resolution import resolution, dp
+from solver.algorithms.portfolio import portfolio, PORTFOLIO_METHODS
+from solver.algorithms.cube import cube_and_conquer
+from solver.algorithms.local_search import local_search, hybrid, LOCAL_SEARCH_METHODS
+from solver.algorithms.decompose import solve_components
+from solver.algorithms.count import count_models
+from solver.components import split_components
+from solver.cardinality import cardinality_clauses, detect_at_most_one
+from solver.preprocess import Preprocessor
+from solver.restarts import RESTART_POLICIES
+from solver.lookahead import Lookahead
+from solver.stats import SearchStats
 
-def solve(clauses, method="dpll", branching_method = None, verbose=False):
-    if method == "dpll":
-        return dpll(clauses, method=branching_method, verbose=verbose)
-    if method == "dp":
-        return dp(clauses, verbose=verbose)
-    elif method == "resolution":
-        return resolution(clauses, verbose=verbose)
-    else:
-        raise ValueError(f"Unknown method: {method}")
+SOLVING_METHODS = ("dp", "resolution", "cdcl", "portfolio", "cube", "walksat", "probsat", "hybrid", "count")
+
+def solve(clauses, method="dpll", branching_method = None, verbose=False, stats=None, methods=None, workers=None,
+          preprocess=False, restarts=None, restart_base=100, phase_saving=False, hook=None, progress=None,
+          seed=None, max_flips=None, max_tries=None, decompose=False, num_vars=None, cache_bytes=64 << 20,
+          cardinality=(), detect_amo=False, lookahead_candidates=Lookahead.MAX_CANDIDATES, preprocess_effort=1.0):
+    """
+    Solve the clauses with `method`, or with DPLL and `branching_method`.
+
+    With `decompose` a formula made of variable-disjoint components is solved
+    one component at a time, on `workers` processes if more than one is
+    requested, and DPLL also decomposes the residual formula at every node.
+    Portfolio and cube-and-conquer ignore it.
+
+    `cardinality` holds (literals, k) constraints: at most k of the literals
+    are True. DPLL propagates them natively; the other methods and
+    preprocessing get their clause encoding. With `detect_amo` DPLL first
+    replaces at-most-one constraints written as pairwise binary clauses by
+    native constraints.
+
+    `preprocess_effort` scales the subsumption, probing and elimination
+    limits of the `Preprocessor` used with `preprocess`.
+
+    The UP and GUP heuristics probe at most `lookahead_candidates` literals
+    per node; None probes all of them.
+
+    method="count" returns (number of models, decisions) instead: the models
+    are counted over the variables 1..num_vars (by default up to the largest
+    variable in the clauses), with a component cache of about `cache_bytes`.
+
+    If a dict is passed as `stats` it is filled with the solver statistics and,
+    when the solver found one, the model under "model" as one literal per
+    variable of the original formula.
+    """
+    if preprocess and method == "count":
+        raise ValueError("Preprocessing does not preserve the number of models")
+    if cardinality and (preprocess or method != "dpll"):
+        # Only DPLL propagates constraints natively
+        clauses = list(clauses) + [clause for literals, k in cardinality for clause in cardinality_clauses(literals, k)]
+        cardinality = ()
+    if preprocess:
+        preprocessor = Preprocessor(clauses, effort=preprocess_effort, verbose=verbose)
+        clauses = preprocessor.run()
+        if stats is not None:
+            stats["preprocess"] = preprocessor.stats
+        if clauses is None:
+            return False if method in ("dp", "resolution") else (False, 0)
+        result = solve(clauses, method, branching_method, verbose, stats, methods, workers, restarts=restarts,
+                       restart_base=restart_base, phase_saving=phase_saving, hook=hook, progress=progress,
+                       seed=seed, max_flips=max_flips, max_tries=max_tries, decompose=decompose,
+                       detect_amo=detect_amo, lookahead_candidates=lookahead_candidates)
+        if stats is not None and "model" in stats:
+            stats["model"] = preprocessor.reconstruct(stats["model"])
+        return result
+    if decompose and not cardinality and method not in ("portfolio", "cube", "count"):
+        parts = split_components(clauses)
+        if len(parts) > 1:
+            options = dict(method=method, branching_method=branching_method, verbose=False, restarts=restarts,
+                           restart_base=restart_base, phase_saving=phase_saving, seed=seed, max_flips=max_flips,
+                           max_tries=max_tries, decompose=True, detect_amo=detect_amo,
+                           lookahead_candidates=lookahead_candidates)
+            result = solve_components(parts, solve, options, workers=workers, verbose=verbose, stats=stats)
+            return result[0] if method in ("dp", "resolution") else result
+    if method in ("dpll", "dp", "resolution", "count") + LOCAL_SEARCH_METHODS + ("hybrid",):
+        # Search statistics, trace hooks and progress lines
+        search = SearchStats(hook=hook, progress=progress)
+        if method == "dpll":
+            if detect_amo:
+                clauses, found = detect_at_most_one(clauses)
+                cardinality = list(cardinality) + found
+                if verbose:
+                    print(f"Replaced pairwise clauses by {len(found)} at-most-one constraints")
+                if stats is not None:
+                    stats["detected_amo"] = len(found)
+            result = dpll(clauses, method=branching_method, verbose=verbose, restarts=restarts,
+                          restart_base=restart_base, phase_saving=phase_saving, decompose=decompose,
+                          cardinality=cardinality, stats=search, lookahead_candidates=lookahead_candidates)
+        elif method == "dp":
+            result = dp(clauses, verbose=verbose, stats=search)
+        elif method == "count":
+            result = count_models(clauses, method=branching_method or "JW", num_vars=num_vars,
+                                  cache_bytes=cache_bytes, verbose=verbose, stats=search)
+        elif method in LOCAL_SEARCH_METHODS or method == "hybrid":
+            # Unset budgets keep the defaults of each engine
+            budget = {key: value for key, value in (("max_flips", max_flips), ("max_tries", max_tries))
+                      if value is not None}
+            if method == "hybrid":
+                result = hybrid(clauses, method=branching_method or "JW", seed=seed, verbose=verbose,
+                                stats=search, **budget)
+            else:
+                result = local_search(clauses, method=method, seed=seed, verbose=verbose, stats=search, **budget)
+        else:
+            result = resolution(clauses, verbose=verbose, stats=search)
+        if stats is not None:
+            stats.update(search.as_dict())
+            if search.model is not None:
+                stats["model"] = search.model
+        return result
+    if method == "cdcl":
+        return cdcl(clauses, verbose=verbose, stats=stats)
+    if method == "portfolio":
+        return portfolio(clauses, methods=methods or PORTFOLIO_METHODS, verbose=verbose, stats=stats)
+    if method == "cube":
+        return cube_and_conquer(clauses, method=branching_method or "JW", workers=workers, verbose=verbose, stats=stats)
+    raise ValueError(f"Unknown method: {method}")
 
 def main():
     # Parse command-line arguments
     parser = argparse.ArgumentParser(description="Run SAT solver with selected method.")
     parser.add_argument("file", type=str, help="Path to the CNF file to be solved.")
-    parser.add_argument("--method", type=str, default="first", help="The method to solve the SAT problem. Options: resolution, dp, first, random, MAXO, MOMS, MAMS, JW, UP, GUP.")
+    parser.add_argument("--method", type=str, default="first", help="The method to solve the SAT problem. Options: resolution, dp, cdcl, portfolio, cube, walksat, probsat, hybrid, count, first, random, MAXO, MOMS, MAMS, JW, UP, GUP, SUP, VSIDS.")
+    parser.add_argument("--portfolio", type=str, nargs="+", default=list(PORTFOLIO_METHODS), help="Methods raced by --method portfolio: DPLL branching heuristics, cdcl or dp.")
+    parser.add_argument("--cube-heuristic", type=str, default="JW", help="DPLL branching heuristic used by --method cube.")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes for --method cube (default: all cores) and --decompose (default: one).")
+    parser.add_argument("--fallback", type=str, default="JW", help="DPLL branching heuristic used by --method hybrid after local search.")
+    parser.add_argument("--count-heuristic", type=str, default="JW", help="DPLL branching heuristic used by --method count.")
+    parser.add_argument("--cache-mb", type=float, default=64, help="Memory cap of the --method count component cache in MiB.")
+    parser.add_argument("--seed", type=int, default=None, help="Random seed of the local search.")
+    parser.add_argument("--max-flips", type=int, default=None, help="Flips per local search try.")
+    parser.add_argument("--max-tries", type=int, default=None, help="Local search tries, each from a new random assignment.")
+    parser.add_argument("--preprocess", action="store_true", help="Simplify the formula with subsumption, probing and variable elimination before solving.")
+    parser.add_argument("--preprocess-effort", type=float, default=1.0, help="Scale the subsumption, probing and elimination limits of --preprocess (default: 1).")
+    parser.add_argument("--restarts", type=str, choices=RESTART_POLICIES, default=None, help="Restart policy of the DPLL search (default: no restarts). The refuted branches are kept as nogood clauses, so a restart does not repeat them.")
+    parser.add_argument("--restart-base", type=int, default=100, help="Conflicts before the first DPLL restart.")
+    parser.add_argument("--phase-saving", action="store_true", help="Branch on the last value of each variable in the DPLL search.")
+    parser.add_argument("--progress", type=float, default=None, help="Print a DPLL, DP, resolution or local search progress line every N seconds.")
+    parser.add_argument("--decompose", action="store_true", help="Solve variable-disjoint components of the formula separately, in parallel with --workers.")
+    parser.add_argument("--detect-amo", action="store_true", help="Replace pairwise at-most-one clauses by native DPLL constraints.")
+    parser.add_argument("--lookahead-candidates", type=int, default=Lookahead.MAX_CANDIDATES, help="Literals probed per node by the UP and GUP heuristics (0: all of them).")
+    parser.add_argument("--stats", type=str, default=None, help="Write the solver statistics as JSON to this file.")
     parser.add_argument("--verbose", action="store_true", help="Print detailed output during solving.")
     
     args = parser.parse_args()
     
-    # Parse CNF file
-    num_vars, num_clauses, clauses = parse_dimacs_cnf(args.file)
+    # Parse CNF file; "cnf+" files also contain cardinality constraints
+    constraints = []
+    if is_cardinality_cnf(args.file):
+        num_vars, num_clauses, clauses, constraints = parse_cardinality_cnf(args.file)
+    else:
+        num_vars, num_clauses, clauses = parse_dimacs_cnf(args.file, compact=True)
     clauses = convert_clauses_to_solver_format(clauses)
     
-    # Solve using the chosen method
-    result = solve(clauses, method=args.method, verbose=args.verbose)
+    # Solve using the chosen method; any other name is a DPLL branching heuristic
+    stats = {}
+    if args.method in SOLVING_METHODS:
+        branching_method = {"hybrid": args.fallback, "count": args.count_heuristic}.get(args.method,
+                                                                                         args.cube_heuristic)
+        result = solve(clauses, method=args.method, branching_method=branching_method, verbose=args.verbose,
+                       stats=stats, methods=args.portfolio, workers=args.workers, preprocess=args.preprocess,
+                       progress=args.progress, seed=args.seed, max_flips=args.max_flips, max_tries=args.max_tries,
+                       decompose=args.decompose, num_vars=num_vars, cache_bytes=int(args.cache_mb * (1 << 20)),
+                       cardinality=constraints, preprocess_effort=args.preprocess_effort)
+    else:
+        result = solve(clauses, branching_method=args.method, verbose=args.verbose, stats=stats,
+                       preprocess=args.preprocess, restarts=args.restarts, restart_base=args.restart_base,
+                       phase_saving=args.phase_saving, progress=args.progress, workers=args.workers,
+                       decompose=args.decompose, cardinality=constraints, detect_amo=args.detect_amo,
+                       lookahead_candidates=args.lookahead_candidates or None,
+                       preprocess_effort=args.preprocess_effort)
+    if args.stats:
+        with open(args.stats, "w") as f:
+            json.dump(stats, f, indent=2)
+    if isinstance(result, tuple):
+        result = result[0]
     
     # Output the result
     if result:
         print("\nSATISFIABLE")
+        if args.method == "count":
+            print(f"Models: {result}")
+    elif result is None:
+        # Local search ran out of flips
+        print("\nUNKNOWN")
     else:
         print("\nUNSATISFIABLE")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,93 @@
+import json
+import time
+
+COUNTERS = ("decisions", "propagations", "conflicts", "backtracks", "restarts", "max_depth",
+            "eliminated", "resolvents", "subsumed", "flips",
+            "decompositions", "components", "skipped_components",
+            "cache_hits", "cache_misses", "cache_evictions")
+
+
+class SearchStats:
+    """
+    Search statistics filled in by `dpll`, `dp`, `resolution`, local search
+    and model counting.
+
+    Counters are plain attributes named in `COUNTERS`, and `times` holds the
+    seconds spent per phase ("propagation", "heuristic", "simplification",
+    "resolution"). The solvers update them with integer additions and one
+    clock read per phase, so an unused instance costs next to nothing.
+
+    `hook`, if given, is called as hook(event, stats, **data) for every search
+    event ("decision", "conflict", "backtrack", "restart", "eliminate",
+    "given", "decompose", "progress", "done"). With `progress` set, a one-line summary is
+    printed about every `progress` seconds.
+
+    Solvers that find a model store it in `model`, one literal per variable.
+    """
+
+    def __init__(self, hook=None, progress=None):
+        for name in COUNTERS:
+            setattr(self, name, 0)
+        self.times = {}
+        self.result = None
+        self.model = None
+        self.hook = hook
+        self.progress = progress
+        self.start = time.perf_counter()
+        self.elapsed = 0.0
+        self.next_progress = self.start + progress if progress else None
+
+    def add_time(self, phase, seconds):
+        self.times[phase] = self.times.get(phase, 0.0) + seconds
+
+    def absorb(self, other, depth=0):
+        """
+        Add the counters and times of a sub-search started at `depth`, such as
+        the search of one component.
+        """
+        for name in COUNTERS:
+            if name != "max_depth":
+                setattr(self, name, getattr(self, name) + getattr(other, name))
+        self.max_depth = max(self.max_depth, depth + other.max_depth)
+        for phase, seconds in other.times.items():
+            self.add_time(phase, seconds)
+
+    def event(self, name, **data):
+        if self.hook is not None:
+            self.hook(name, self, **data)
+
+    def tick(self):
+        """
+        Print the progress line if it is due. Called once per search step.
+        """
+        if self.next_progress is None:
+            return
+        now = time.perf_counter()
+        if now >= self.next_progress:
+            self.next_progress = now + self.progress
+            self.elapsed = now - self.start
+            print(self.progress_line())
+            self.event("progress")
+
+    def progress_line(self):
+        counters = " ".join(f"{name}={getattr(self, name)}" for name in COUNTERS if getattr(self, name))
+        return f"c [{self.elapsed:8.2f}s] {counters}"
+
+    def finish(self, result):
+        self.result = result
+        self.elapsed = time.perf_counter() - self.start
+        self.event("done", result=result)
+        return result
+
+    def as_dict(self):
+        """
+        Return the counters, the phase times as "<phase>_time" and the total "time".
+        """
+        data = {name: getattr(self, name) for name in COUNTERS}
+        data.update((f"{phase}_time", seconds) for phase, seconds in self.times.items())
+        data["time"] = self.elapsed
+        data["result"] = self.result
+        return data
+
+    def to_json(self):
+        return json.dumps(self.as_dict())
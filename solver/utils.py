@@ -2,51 +2,85 @@
 def unit_propagation(clauses, indentation="", verbose=True):
     """
     Apply unit propagation to simplify the clauses.
+
+    All pending unit literals are applied together, so the clause list is rebuilt
+    once per propagation round instead of once per unit literal. The counter is
+    the number of literals removed from clauses that were not yet satisfied.
+    Search engines that keep their state between calls should use
+    `solver.propagation.WatchedPropagator` instead.
     """
-    unit_clauses = [clause for clause in clauses if len(clause) == 1]
+    units = {next(iter(clause)) for clause in clauses if len(clause) == 1}
     counter = 0
-    while unit_clauses:
-        unit = unit_clauses.pop()
-        literal = next(iter(unit))
-        if verbose:
-            print(f"{indentation}Found unit literal {literal}")
+    while units:
+        for literal in units:
+            if -literal in units:
+                if verbose:
+                    print(f"{indentation}Found complementary unit literals {literal} and {-literal}")
+                return False, counter
+            if verbose:
+                print(f"{indentation}Found unit literal {literal}")
+        negated = {-literal for literal in units}
+        new_units = set()
         new_clauses = []
         for clause in clauses:
-            if literal in clause:
+            if not units.isdisjoint(clause):
                 if verbose:
                     print(f"{indentation}Removed clause {set(clause)}")
                 continue
-            if -literal in clause:
-                new_clause = clause - {-literal}
-                counter += 1
-                if len(new_clause) == 0:
-                    if verbose:
-                        print(f"{indentation}Removed {-literal} from clause {set(clause)} resulting in ∅")
-                    return False, counter
-                if verbose:
-                    print(f"{indentation}Removed {-literal} from clause {set(clause)} resulting {set(new_clause)}")
-                if len(new_clause) == 1:
-                    unit_clauses.append(new_clause)
-                new_clauses.append(new_clause)
-            else:
+            if negated.isdisjoint(clause):
                 new_clauses.append(clause)
+                continue
+            new_clause = frozenset(clause).difference(negated)
+            counter += len(clause) - len(new_clause)
+            if len(new_clause) == 0:
+                if verbose:
+                    print(f"{indentation}Removed {set(clause)} resulting in ∅")
+                return False, counter
+            if verbose:
+                print(f"{indentation}Removed {negated.intersection(clause)} from clause {set(clause)} resulting {set(new_clause)}")
+            if len(new_clause) == 1:
+                new_units.update(new_clause)
+            new_clauses.append(new_clause)
         clauses = new_clauses
+        units = new_units
     return clauses, counter
 
 
 def pure_literal_elimination(clauses, indentation="", verbose=True):
     """
     Apply pure literal elimination.
+
+    Literal counts are computed once and decremented as clauses are removed, so
+    literals that become pure are found without rescanning the clauses.
     """
-    literals = set(l for clause in clauses for l in clause)
-    pure_literals = {l for l in literals if -l not in literals}
+    counts = {}
+    occurrences = {}
+    for i, clause in enumerate(clauses):
+        for l in clause:
+            counts[l] = counts.get(l, 0) + 1
+            occurrences.setdefault(l, []).append(i)
+    pure_literals = [l for l in counts if -l not in counts]
     if not pure_literals:
         return clauses
-    new_clauses = []
-    for clause in clauses:
-        if any(lit in pure_literals for lit in clause):
+    removed = [False] * len(clauses)
+    while pure_literals:
+        pure = pure_literals.pop()
+        for i in occurrences[pure]:
+            if removed[i]:
+                continue
+            removed[i] = True
             if verbose:
-                print(f"{indentation}Removed clause {set(clause)} because it contains a pure literal")
-            continue
-        new_clauses.append(clause)
-    return pure_literal_elimination(new_clauses, indentation, verbose)
\ No newline at end of file
+                print(f"{indentation}Removed clause {set(clauses[i])} because it contains a pure literal")
+            for l in clauses[i]:
+                counts[l] -= 1
+                if counts[l] == 0 and counts.get(-l, 0) > 0:
+                    pure_literals.append(-l)
+    return [clause for i, clause in enumerate(clauses) if not removed[i]]
+
+
+def best_scoring_literal(literals, scores):
+    """
+    Return the literal with the highest score. Ties go to the smaller variable,
+    then to the positive literal.
+    """
+    return max(literals, key=lambda l: (scores[l], -abs(l), l))
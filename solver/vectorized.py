@@ -0,0 +1,79 @@
+from itertools import chain
+from solver.clausedb import ClauseDB, decode
+
+try:
+    import numpy as np
+except ImportError:  # Optional: select_literal keeps its pure Python path without NumPy
+    np = None
+
+METHODS = ("MAXO", "MOMS", "MAMS", "JW")
+
+# Below this many clauses the NumPy call overhead outweighs the Python scoring loops
+MIN_CLAUSES = 64
+
+
+def flatten(clauses):
+    """
+    Return the clauses as an int32 array of literals encoded as 2 * var + sign
+    and an array of clause lengths. A `ClauseDB` is viewed without copying.
+    """
+    if isinstance(clauses, ClauseDB):
+        codes = np.frombuffer(clauses.literals, dtype=np.int32)
+        lengths = np.diff(np.frombuffer(clauses.offsets, dtype=np.int32))
+        return codes, lengths
+    lengths = np.fromiter(map(len, clauses), dtype=np.int32, count=len(clauses))
+    literals = np.fromiter(chain.from_iterable(clauses), dtype=np.int32, count=int(lengths.sum()))
+    codes = (np.abs(literals) << 1) | (literals < 0)
+    return codes, lengths
+
+
+def scores(codes, lengths, method):
+    """
+    Return the scores of `method` indexed by literal code, and the mask of the
+    literals that can be chosen. Returns None if the JW weights cannot be
+    summed exactly in float64.
+
+    JW weights are scaled by 2 ** max_len, so clause of length k weighs
+    2 ** (max_len - k). They are exact integers and so are their sums while the
+    total stays below 2 ** 53, which makes equal scores compare equal.
+    """
+    size = (int(codes.max()) | 1) + 1
+    if method == "MAXO":
+        counts = np.bincount(codes, minlength=size)
+        return counts, counts > 0
+    literal_lengths = np.repeat(lengths, lengths)
+    if method in ("MOMS", "MAMS"):
+        min_counts = np.bincount(codes[literal_lengths == lengths.min()], minlength=size)
+        if method == "MOMS":
+            return min_counts, min_counts > 0
+        counts = np.bincount(codes, minlength=size)
+        # code ^ 1 is the code of the negated literal
+        negated = min_counts.reshape(-1, 2)[:, ::-1].ravel()
+        return counts + negated, counts > 0
+    if method == "JW":
+        max_len = int(lengths.max())
+        spread = max_len - int(lengths.min())
+        if spread > 52 or len(codes) << spread >= 1 << 53:
+            return None
+        weights = np.ldexp(1.0, max_len - literal_lengths)
+        jw = np.bincount(codes, weights=weights, minlength=size)
+        return jw, jw > 0
+    raise ValueError(f"Unknown vectorized method: {method}")
+
+
+def select_flat(clauses, method):
+    """
+    Select a branching literal for MAXO, MOMS, MAMS or JW with batched NumPy
+    scoring over the flattened clauses.
+
+    Ties go to the smaller variable, then to the positive literal, like
+    `utils.best_scoring_literal`: `np.argmax` returns the first maximum and
+    codes are ordered by variable with the positive literal first. Returns
+    None if the scores cannot be computed exactly.
+    """
+    codes, lengths = flatten(clauses)
+    result = scores(codes, lengths, method)
+    if result is None:
+        return None
+    values, present = result
+    return decode(int(np.argmax(np.where(present, values, -1))))
@@ -0,0 +1,160 @@
+class VariableHeap:
+    """
+    Binary max-heap of variables ordered by an external activity list.
+    `indices[var]` is the position of var in the heap or -1 if it is not in it,
+    so membership tests are O(1) and an activity increase can be restored in
+    O(log n) without searching the heap.
+    """
+
+    def __init__(self, activity, variables=()):
+        self.activity = activity
+        self.heap = []
+        self.indices = [-1] * len(activity)
+        for var in variables:
+            self.insert(var)
+
+    def __len__(self):
+        return len(self.heap)
+
+    def __contains__(self, var):
+        return self.indices[var] >= 0
+
+    def insert(self, var):
+        if self.indices[var] >= 0:
+            return
+        self.indices[var] = len(self.heap)
+        self.heap.append(var)
+        self._sift_up(len(self.heap) - 1)
+
+    def increased(self, var):
+        """
+        Restore the heap order after the activity of var has grown.
+        """
+        if self.indices[var] >= 0:
+            self._sift_up(self.indices[var])
+
+    def pop(self):
+        heap = self.heap
+        top = heap[0]
+        last = heap.pop()
+        self.indices[top] = -1
+        if heap:
+            heap[0] = last
+            self.indices[last] = 0
+            self._sift_down(0)
+        return top
+
+    def _sift_up(self, i):
+        heap, indices, activity = self.heap, self.indices, self.activity
+        var = heap[i]
+        score = activity[var]
+        while i > 0:
+            parent = (i - 1) >> 1
+            if activity[heap[parent]] >= score:
+                break
+            heap[i] = heap[parent]
+            indices[heap[i]] = i
+            i = parent
+        heap[i] = var
+        indices[var] = i
+
+    def _sift_down(self, i):
+        heap, indices, activity = self.heap, self.indices, self.activity
+        var = heap[i]
+        score = activity[var]
+        n = len(heap)
+        while True:
+            child = 2 * i + 1
+            if child >= n:
+                break
+            if child + 1 < n and activity[heap[child + 1]] > activity[heap[child]]:
+                child += 1
+            if activity[heap[child]] <= score:
+                break
+            heap[i] = heap[child]
+            indices[heap[i]] = i
+            i = child
+        heap[i] = var
+        indices[var] = i
+
+
+class VSIDS:
+    """
+    Variable State Independent Decaying Sum branching heuristic.
+
+    Every variable has an activity that is bumped when it takes part in a
+    conflict; instead of decaying all activities, the bump increment grows by
+    1/decay after every conflict. Unassigned candidates are kept in a
+    `VariableHeap`: assigned variables are dropped lazily when they reach the
+    top, and `unassign` puts them back on backtrack. The polarity of a decision
+    is the last value the variable had (phase saving), initially the polarity
+    that occurs most often in the formula.
+    """
+
+    def __init__(self, propagator, decay=0.95):
+        num_vars = propagator.num_vars
+        self.values = propagator.values
+        self.decay = decay
+        self.increment = 1.0
+        self.activity = [0.0] * (num_vars + 1)
+        balance = [0] * (num_vars + 1)
+        for clause in propagator.clauses:
+            for lit in clause or ():
+                var = abs(lit)
+                self.activity[var] += 1e-3
+                balance[var] += 1 if lit > 0 else -1
+        self.phase = [b > 0 for b in balance]
+        self.heap = VariableHeap(self.activity, range(1, num_vars + 1))
+
+    def add_variables(self, num_vars):
+        """
+        Make the variables up to `num_vars` candidates, after the propagator has grown.
+        """
+        start = len(self.activity)
+        extra = num_vars + 1 - start
+        if extra <= 0:
+            return
+        self.activity.extend([0.0] * extra)
+        self.phase.extend([False] * extra)
+        self.heap.indices.extend([-1] * extra)
+        for var in range(start, num_vars + 1):
+            self.heap.insert(var)
+
+    def bump(self, var):
+        activity = self.activity
+        activity[var] += self.increment
+        if activity[var] > 1e100:
+            for v in range(len(activity)):
+                activity[v] *= 1e-100
+            self.increment *= 1e-100
+        self.heap.increased(var)
+
+    def bump_clause(self, clause):
+        for lit in clause:
+            self.bump(abs(lit))
+        self.decay_activities()
+
+    def decay_activities(self):
+        self.increment /= self.decay
+
+    def unassign(self, literals):
+        """
+        Save the phase of the given literals and make their variables candidates again.
+        """
+        for lit in literals:
+            var = abs(lit)
+            self.phase[var] = lit > 0
+            self.heap.insert(var)
+
+    def select(self):
+        """
+        Return the decision literal for the most active unassigned variable,
+        or None if every variable is assigned.
+        """
+        heap = self.heap
+        values = self.values
+        while heap:
+            var = heap.pop()
+            if not values[var]:
+                return var if self.phase[var] else -var
+        return None
@@ -0,0 +1,79 @@
+import os
+import time
+import random
+import argparse
+import tempfile
+from solver.parser import parse_dimacs_cnf, parse_cardinality_cnf
+from solver.solver import solve
+
+
+def coloring_instance(vertices, colors, density, seed=0):
+    """
+    Random graph coloring: variable v * colors + c + 1 means vertex v has
+    color c. Returns the clauses (one color at least per vertex, different
+    colors on every edge) and the at-most-one constraint of every vertex.
+    """
+    rng = random.Random(seed)
+    var = lambda v, c: v * colors + c + 1
+    clauses = [[var(v, c) for c in range(colors)] for v in range(vertices)]
+    for u in range(vertices):
+        for v in range(u + 1, vertices):
+            if rng.random() < density:
+                clauses.extend([-var(u, c), -var(v, c)] for c in range(colors))
+    constraints = [([var(v, c) for c in range(colors)], 1) for v in range(vertices)]
+    return vertices * colors, clauses, constraints
+
+
+def write_instance(path, num_vars, clauses, constraints, native):
+    """Write the instance as DIMACS with pairwise at-most-one clauses, or as "cnf+" with native constraints."""
+    with open(path, "w") as f:
+        lines = [" ".join(map(str, clause)) + " 0" for clause in clauses]
+        for literals, k in constraints:
+            if native:
+                lines.append(" ".join(map(str, literals)) + f" <= {k}")
+            else:
+                lines.extend(f"{-a} {-b} 0" for i, a in enumerate(literals) for b in literals[i + 1:])
+        f.write(f"p {'cnf+' if native else 'cnf'} {num_vars} {len(lines)}\n")
+        f.write("\n".join(lines) + "\n")
+
+
+def timed(function, *args, **kwargs):
+    start_time = time.perf_counter()
+    result = function(*args, **kwargs)
+    return result, time.perf_counter() - start_time
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare pairwise at-most-one clauses with native cardinality "
+                                                 "constraints on random graph coloring instances.")
+    parser.add_argument("--vertices", type=int, default=30, help="Vertices of each graph.")
+    parser.add_argument("--colors", type=int, default=20, help="Colors, i.e. the domain size of every vertex.")
+    parser.add_argument("--density", type=float, default=0.3, help="Edge probability.")
+    parser.add_argument("--instances", type=int, default=5, help="Instances to generate.")
+    parser.add_argument("--method", type=str, default="JW", help="DPLL branching heuristic.")
+    args = parser.parse_args()
+
+    totals = {}
+    with tempfile.TemporaryDirectory() as folder:
+        for seed in range(args.instances):
+            num_vars, clauses, constraints = coloring_instance(args.vertices, args.colors, args.density, seed)
+            pairwise_path = os.path.join(folder, f"pairwise-{seed}.cnf")
+            native_path = os.path.join(folder, f"native-{seed}.cnf")
+            write_instance(pairwise_path, num_vars, clauses, constraints, native=False)
+            write_instance(native_path, num_vars, clauses, constraints, native=True)
+
+            (_, _, pairwise), pairwise_parse = timed(parse_dimacs_cnf, pairwise_path, cache=False)
+            (_, _, native, native_constraints), native_parse = timed(parse_cardinality_cnf, native_path)
+            runs = {
+                "pairwise": timed(solve, pairwise, branching_method=args.method),
+                "detected": timed(solve, pairwise, branching_method=args.method, detect_amo=True),
+                "native": timed(solve, native, branching_method=args.method, cardinality=native_constraints),
+            }
+            results = {name: result[0] for name, (result, _) in runs.items()}
+            print(f"Instance {seed}: {len(pairwise)} clauses pairwise, {len(native)} clauses + "
+                  f"{len(native_constraints)} constraints native; parse {pairwise_parse:.3f}s / {native_parse:.3f}s; "
+                  + ", ".join(f"{name} {seconds:.3f}s" for name, (_, seconds) in runs.items())
+                  + ("" if len(set(results.values())) == 1 else f" (RESULTS DIFFER: {results})"))
+            for name, (_, seconds) in runs.items():
+                totals[name] = totals.get(name, 0.0) + seconds
+    print("Total: " + ", ".join(f"{name} {seconds:.3f}s" for name, seconds in totals.items()))
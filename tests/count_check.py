@@ -0,0 +1,97 @@
+import os
+import time
+import argparse
+from solver.parser import parse_dimacs_cnf
+from solver.solver import solve
+
+# Truth tables are big ints of 2 ** num_vars bits, so brute force stops here
+MAX_TABLE_VARS = 24
+
+
+def truth_table_count(clauses, num_vars):
+    """
+    Count the models by brute force: bit i of a table is the value of the
+    formula under the assignment whose bits are the variable values.
+    """
+    size = 1 << num_vars
+    full = (1 << size) - 1
+    tables = [0]
+    for var in range(num_vars):
+        # 2 ** var zero bits then 2 ** var one bits, doubled until it fills the table
+        length = 2 << var
+        table = ((1 << (1 << var)) - 1) << (1 << var)
+        while length < size:
+            table |= table << length
+            length *= 2
+        tables.append(table)
+    formula = full
+    for clause in clauses:
+        table = 0
+        for lit in clause:
+            table |= tables[lit] if lit > 0 else full ^ tables[-lit]
+        formula &= table
+    return bin(formula).count("1")
+
+
+def enumeration_count(clauses, num_vars):
+    """
+    Count the models by plain backtracking with unit propagation, without
+    components or caching: every satisfying branch adds 2 ** (free variables).
+    """
+    def count(clauses, assigned):
+        while True:
+            if any(not clause for clause in clauses):
+                return 0
+            units = {next(iter(clause)) for clause in clauses if len(clause) == 1}
+            if not units:
+                break
+            if any(-lit in units for lit in units):
+                return 0
+            assigned = assigned | {abs(lit) for lit in units}
+            clauses = [clause - {-lit for lit in units} for clause in clauses if units.isdisjoint(clause)]
+        if not clauses:
+            return 1 << (num_vars - len(assigned))
+        var = abs(next(iter(clauses[0])))
+        return sum(count([clause - {-lit} for clause in clauses if lit not in clause], assigned | {var})
+                   for lit in (var, -var))
+
+    return count([set(clause) for clause in clauses], frozenset())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check --method count against brute-force model counts.")
+    parser.add_argument("paths", nargs="+", help="CNF files or folders containing CNF files.")
+    parser.add_argument("--limit", type=int, default=20, help="Instances checked per folder.")
+    parser.add_argument("--method", type=str, default="JW", help="Branching heuristic of the counter.")
+    args = parser.parse_args()
+
+    files = []
+    for path in args.paths:
+        if os.path.isdir(path):
+            files.extend([os.path.join(path, f) for f in sorted(os.listdir(path)) if ".cnf" in f][:args.limit])
+        else:
+            files.append(path)
+
+    mismatches = hits = lookups = 0
+    count_time = reference_time = 0.0
+    for file_path in files:
+        num_vars, _, clauses = parse_dimacs_cnf(file_path)
+        stats = {}
+        start_time = time.perf_counter()
+        count, _ = solve(clauses, method="count", branching_method=args.method, num_vars=num_vars, stats=stats)
+        count_time += time.perf_counter() - start_time
+        start_time = time.perf_counter()
+        if num_vars <= MAX_TABLE_VARS:
+            reference, how = truth_table_count(clauses, num_vars), "truth table"
+        else:
+            reference, how = enumeration_count(clauses, num_vars), "enumeration"
+        reference_time += time.perf_counter() - start_time
+        hits += stats["cache_hits"]
+        lookups += stats["cache_hits"] + stats["cache_misses"]
+        if count != reference:
+            mismatches += 1
+        print(f"{os.path.basename(file_path)}: {count} models ({how}: {reference}), "
+              f"cache hits {stats['cache_hits']}/{stats['cache_hits'] + stats['cache_misses']}"
+              f"{'' if count == reference else ' (COUNTS DIFFER)'}")
+    print(f"Total: {len(files)} instances, {mismatches} mismatches, counter {count_time:.2f}s, "
+          f"reference {reference_time:.2f}s, cache hit rate {hits / lookups if lookups else 0:.1%}")
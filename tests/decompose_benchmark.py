@@ -0,0 +1,67 @@
+import os
+import time
+import random
+import argparse
+from solver.parser import parse_dimacs_cnf
+from solver.solver import solve
+
+
+def disjoint_union(formulas):
+    """Rename the variables of every formula apart and return the conjunction of all of them."""
+    clauses = []
+    offset = 0
+    for formula in formulas:
+        clauses.extend([lit + offset if lit > 0 else lit - offset for lit in clause] for clause in formula)
+        offset += max((abs(lit) for clause in formula for lit in clause), default=0)
+    return clauses
+
+
+def benchmark(clauses, method, workers=None):
+    """
+    Solve the clauses with and without decomposition. Returns the result,
+    the seconds and decisions of both runs, and the decomposition statistics.
+    """
+    runs = []
+    for decompose in (False, True):
+        stats = {}
+        start_time = time.perf_counter()
+        result, _ = solve(clauses, branching_method=method, stats=stats, decompose=decompose, workers=workers)
+        runs.append((result, time.perf_counter() - start_time, stats))
+    return runs
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare DPLL with and without component decomposition "
+                                                 "on disjoint unions of CNF files.")
+    parser.add_argument("paths", nargs="+", help="CNF files or folders containing CNF files.")
+    parser.add_argument("--parts", type=int, default=4, help="Instances joined into each formula.")
+    parser.add_argument("--formulas", type=int, default=5, help="Formulas to build.")
+    parser.add_argument("--method", type=str, default="JW", help="DPLL branching heuristic.")
+    parser.add_argument("--workers", type=int, default=None, help="Processes for the root components.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the instance sampling.")
+    args = parser.parse_args()
+
+    files = []
+    for path in args.paths:
+        if os.path.isdir(path):
+            files.extend(os.path.join(path, f) for f in sorted(os.listdir(path)) if ".cnf" in f)
+        else:
+            files.append(path)
+
+    rng = random.Random(args.seed)
+    totals = [0.0, 0.0]
+    for i in range(args.formulas):
+        chosen = rng.sample(files, min(args.parts, len(files)))
+        clauses = disjoint_union([parse_dimacs_cnf(f)[2] for f in chosen])
+        (plain, plain_time, plain_stats), (split, split_time, split_stats) = benchmark(clauses, args.method,
+                                                                                       args.workers)
+        totals[0] += plain_time
+        totals[1] += split_time
+        print(f"Formula {i + 1} ({', '.join(os.path.basename(f) for f in chosen)}): "
+              f"{'SAT' if plain else 'UNSAT'}, plain {plain_time:.3f}s / {plain_stats['decisions']} decisions, "
+              f"decomposed {split_time:.3f}s / {split_stats['decisions']} decisions, "
+              f"{split_stats['decompositions']} decompositions, {split_stats['components']} components, "
+              f"{split_stats['skipped_components']} skipped"
+              f"{'' if plain == split else ' (RESULTS DIFFER)'}")
+    if totals[1]:
+        print(f"Total: plain {totals[0]:.3f}s, decomposed {totals[1]:.3f}s, speedup {totals[0] / totals[1]:.1f}x")
@@ -1,57 +1,182 @@
-import random
 import os
-def generate_3sat_cnf(num_vars, num_clauses, seed=None):
-    if seed is not None:
-        random.seed(seed)
-    
+import random
+import argparse
+from solver.parser import COMPRESSED_OPENERS
+
+# Clause/variable ratio of the satisfiability threshold of random k-SAT
+PHASE_TRANSITION = {2: 1.0, 3: 4.267, 4: 9.931, 5: 21.117, 6: 43.37, 7: 87.79}
+
+# Clauses formatted before each write
+WRITE_BATCH = 1 << 14
+
+
+def instance_rng(family, seed, index=0):
+    """
+    Return a random generator of its own for instance `index` of a family.
+    Seeding from a string is stable across runs and Python versions, and no
+    instance depends on how many numbers another one drew.
+    """
+    return random.Random(f"{family}/{seed}/{index}")
+
+
+def random_ksat(num_vars, k=3, ratio=None, num_clauses=None, rng=None):
+    """
+    Uniform random k-SAT: every clause has k distinct variables with random
+    signs. The number of clauses is `num_clauses`, or `ratio` times the
+    number of variables, by default at the phase transition where random
+    instances are hardest.
+    """
+    rng = rng or random.Random()
+    if num_clauses is None:
+        num_clauses = round((ratio or PHASE_TRANSITION[k]) * num_vars)
+    variables = range(1, num_vars + 1)
     clauses = []
-    
     for _ in range(num_clauses):
-        clause = set()
-        while len(clause) < 3:
-            var = random.randint(1, num_vars)
-            lit = var if random.choice([True, False]) else -var
-            clause.add(lit)
-        clauses.append(list(clause))
-    
-    return clauses
-
-
-def write_dimacs_file(filename, num_vars, clauses):
-    with open(filename, 'w') as f:
+        clauses.append([var if rng.random() < 0.5 else -var for var in rng.sample(variables, k)])
+    return num_vars, clauses
+
+
+def flat_coloring(vertices, edges=None, colors=3, rng=None):
+    """
+    "Flat" graph coloring in the SATLIB encoding: the vertices are split into
+    `colors` hidden classes of equal size and the edges join different
+    classes, spread evenly over the pairs of classes, so the instance is
+    always satisfiable. `edges` defaults to 2.3 per vertex, about where the
+    SATLIB flat instances are.
+
+    Variable v * colors + c + 1 means vertex v has color c. Every vertex gets
+    at least one and at most one color, and the ends of every edge differ.
+    """
+    rng = rng or random.Random()
+    if edges is None:
+        edges = round(2.3 * vertices)
+    order = list(range(vertices))
+    rng.shuffle(order)
+    classes = [order[c::colors] for c in range(colors)]
+    pairs = [(a, b) for a in range(colors) for b in range(a + 1, colors)]
+    possible = sum(len(classes[a]) * len(classes[b]) for a, b in pairs)
+    if edges > possible:
+        raise ValueError(f"At most {possible} edges fit between {colors} classes of {vertices} vertices")
+    counts = dict.fromkeys(pairs, 0)
+    chosen = set()
+    for i in range(edges):
+        # Edges go to the class pairs in turn; a full pair passes its turn on
+        a, b = next(pair for pair in (pairs[(i + j) % len(pairs)] for j in range(len(pairs)))
+                    if counts[pair] < len(classes[pair[0]]) * len(classes[pair[1]]))
+        counts[a, b] += 1
+        while True:
+            u, v = rng.choice(classes[a]), rng.choice(classes[b])
+            edge = (min(u, v), max(u, v))
+            if edge not in chosen:
+                chosen.add(edge)
+                break
+
+    var = lambda v, c: v * colors + c + 1
+    clauses = [[var(v, c) for c in range(colors)] for v in range(vertices)]
+    for v in range(vertices):
+        clauses.extend([-var(v, c), -var(v, d)] for c in range(colors) for d in range(c + 1, colors))
+    for u, v in sorted(chosen):
+        clauses.extend([-var(u, c), -var(v, c)] for c in range(colors))
+    return vertices * colors, clauses
+
+
+def pigeonhole(holes):
+    """
+    holes + 1 pigeons in `holes` holes, which is unsatisfiable and takes
+    resolution exponentially many steps. Variable p * holes + h + 1 means
+    pigeon p sits in hole h.
+    """
+    var = lambda p, h: p * holes + h + 1
+    clauses = [[var(p, h) for h in range(holes)] for p in range(holes + 1)]
+    for h in range(holes):
+        clauses.extend([-var(p, h), -var(q, h)] for p in range(holes + 1) for q in range(p + 1, holes + 1))
+    return (holes + 1) * holes, clauses
+
+
+def generate_3sat_cnf(num_vars, num_clauses, seed=None):
+    """Random 3-SAT clauses with a generator of their own seeded by `seed`."""
+    return random_ksat(num_vars, 3, num_clauses=num_clauses, rng=random.Random(seed))[1]
+
+
+def write_dimacs_file(filename, num_vars, clauses, comments=()):
+    """
+    Write a DIMACS file, compressed if the name ends in .gz, .xz/.lzma or
+    .bz2. Clauses are formatted and written in batches of WRITE_BATCH.
+    """
+    opener = open
+    for suffix, compressed_opener in COMPRESSED_OPENERS.items():
+        if filename.endswith(suffix):
+            opener = compressed_opener
+    with opener(filename, "wt") as f:
+        f.writelines(f"c {comment}\n" for comment in comments)
         f.write(f"p cnf {num_vars} {len(clauses)}\n")
-        for clause in clauses:
-            f.write(" ".join(map(str, clause)) + " 0\n")
-
-            
-def generate_multiple_files(folder, num_files=100, num_vars=6, num_clauses=30):
-    if not os.path.exists(folder):
-        os.makedirs(folder)
-
-    # Generate 100 files with fixed num_vars=6 and num_clauses=30
-    for i in range(num_files):
-        # Generate clauses with 6 variables and 30 clauses
-        clauses = generate_3sat_cnf(num_vars, num_clauses, seed=i)
-        
-        # Define the filename with an index to ensure uniqueness
-        filename = os.path.join(folder, f"cnf_{num_vars}v_{num_clauses}c_{i+1}.cnf")
-        
-        # Write the CNF to the file
-        write_dimacs_file(filename, num_vars, clauses)
-        print(f"Written: {filename}")
-
-# Folder to save the CNF files
-folder = "cnf/generated"
-
-# Generate and write 100 CNF files with 6 variables and 30 clauses
-generate_multiple_files(folder, num_files=100, num_vars=6, num_clauses=30)
-
-# # Generate and write CNF files
-# sizes = [(6,20),(6,30),(8,20),(8,30),(10,50),(20, 80), (30, 120), (40, 160)]
-
-
-# for idx, (num_vars, num_clauses) in enumerate(sizes, 1):
-#     clauses = generate_3sat_cnf(num_vars, num_clauses, seed=idx)
-#     filename = f"cnf_{num_vars}v_{num_clauses}c.cnf"
-#     write_dimacs_file(filename, num_vars, clauses)
-#     print(f"Written: {filename}")
+        for start in range(0, len(clauses), WRITE_BATCH):
+            f.write("".join(" ".join(map(str, clause)) + " 0\n" for clause in clauses[start:start + WRITE_BATCH]))
+
+
+FAMILIES = {"ksat": random_ksat, "flat": flat_coloring, "pigeonhole": pigeonhole}
+
+
+def make_instance(family, seed=0, index=0, **params):
+    """
+    Return (num_vars, clauses) of instance `index` of a family, generated
+    with instance_rng(family, seed, index) and the family's `params`.
+    """
+    if family == "pigeonhole":
+        return pigeonhole(**params)
+    return FAMILIES[family](rng=instance_rng(family, seed, index), **params)
+
+
+def instance_name(family, num_vars, num_clauses, index):
+    return f"{family}-{num_vars}v-{num_clauses}c-{index + 1:02d}.cnf"
+
+
+def generate_instances(folder, family, count=1, seed=0, suffix="", **params):
+    """
+    Write `count` instances of a family to `folder`. Any single file can be
+    rebuilt from the seed and its index, see make_instance. Returns the
+    paths written.
+    """
+    os.makedirs(folder, exist_ok=True)
+    paths = []
+    for i in range(count):
+        num_vars, clauses = make_instance(family, seed, i, **params)
+        path = os.path.join(folder, instance_name(family, num_vars, len(clauses), i) + suffix)
+        write_dimacs_file(path, num_vars, clauses,
+                          comments=[f"generated by tests.generate_tests: family {family}, seed {seed}, index {i}, "
+                                    + ", ".join(f"{key} {value}" for key, value in params.items())])
+        paths.append(path)
+    return paths
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate seeded random k-SAT, flat graph coloring "
+                                                 "and pigeonhole instances.")
+    parser.add_argument("family", choices=list(FAMILIES), help="Instance family.")
+    parser.add_argument("--folder", type=str, default="cnf/generated", help="Output folder.")
+    parser.add_argument("--count", type=int, default=10, help="Instances to generate.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the family; instance i uses its own generator.")
+    parser.add_argument("--compress", choices=sorted(s.lstrip(".") for s in COMPRESSED_OPENERS), default=None,
+                        help="Compress the output files.")
+    parser.add_argument("--vars", type=int, default=100, help="k-SAT: number of variables.")
+    parser.add_argument("--k", type=int, default=3, help="k-SAT: literals per clause.")
+    parser.add_argument("--ratio", type=float, default=None,
+                        help="k-SAT: clauses per variable (default: the phase transition).")
+    parser.add_argument("--clauses", type=int, default=None, help="k-SAT: number of clauses, overrides --ratio.")
+    parser.add_argument("--vertices", type=int, default=50, help="Flat: number of vertices.")
+    parser.add_argument("--edges", type=int, default=None, help="Flat: number of edges (default: 2.3 per vertex).")
+    parser.add_argument("--colors", type=int, default=3, help="Flat: number of colors.")
+    parser.add_argument("--holes", type=int, default=6, help="Pigeonhole: number of holes.")
+    args = parser.parse_args()
+    if args.family == "ksat" and args.ratio is None and args.clauses is None and args.k not in PHASE_TRANSITION:
+        parser.error(f"No phase transition ratio known for k = {args.k}; pass --ratio or --clauses")
+
+    if args.family == "ksat":
+        params = dict(num_vars=args.vars, k=args.k, ratio=args.ratio, num_clauses=args.clauses)
+    elif args.family == "flat":
+        params = dict(vertices=args.vertices, edges=args.edges, colors=args.colors)
+    else:
+        params = dict(holes=args.holes)
+    suffix = f".{args.compress}" if args.compress else ""
+    for path in generate_instances(args.folder, args.family, args.count, args.seed, suffix, **params):
+        print(f"Written: {path}")
@@ -0,0 +1,70 @@
+import os
+import time
+import argparse
+from solver.parser import parse_dimacs_cnf
+from solver.branch_heuristics import select_literal
+from solver import vectorized
+
+
+def python_select(clauses, method):
+    """Select with the Python scoring loops of `select_literal`."""
+    threshold = vectorized.MIN_CLAUSES
+    vectorized.MIN_CLAUSES = float("inf")
+    try:
+        return select_literal(clauses, "", False, method=method)
+    finally:
+        vectorized.MIN_CLAUSES = threshold
+
+
+SELECTORS = {
+    "python": python_select,
+    "numpy": vectorized.select_flat,
+}
+
+
+def benchmark_heuristics(instances, methods, repeat=5):
+    """
+    Return {(method, selector): best seconds over `repeat` runs} for selecting
+    one literal on every instance, and the methods whose selectors disagreed.
+    """
+    results = {}
+    mismatches = set()
+    for method in methods:
+        for clauses in instances:
+            if len({select(clauses, method) for select in SELECTORS.values()}) > 1:
+                mismatches.add(method)
+        for name, select in SELECTORS.items():
+            best = float("inf")
+            for _ in range(repeat):
+                start_time = time.perf_counter()
+                for clauses in instances:
+                    select(clauses, method)
+                best = min(best, time.perf_counter() - start_time)
+            results[method, name] = best
+    return results, mismatches
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the NumPy heuristic scoring against the Python loops.")
+    parser.add_argument("paths", nargs="+", help="CNF files or folders containing CNF files.")
+    parser.add_argument("--methods", type=str, nargs="+", default=list(vectorized.METHODS), help="Heuristics to compare.")
+    parser.add_argument("--repeat", type=int, default=5, help="Number of runs per heuristic.")
+    args = parser.parse_args()
+    if vectorized.np is None:
+        parser.error("NumPy is not installed")
+
+    files = []
+    for path in args.paths:
+        if os.path.isdir(path):
+            files.extend(os.path.join(path, f) for f in sorted(os.listdir(path)) if ".cnf" in f)
+        else:
+            files.append(path)
+    instances = [parse_dimacs_cnf(file_path)[2] for file_path in files]
+
+    results, mismatches = benchmark_heuristics(instances, args.methods, repeat=args.repeat)
+    for method in args.methods:
+        python_time, numpy_time = results[method, "python"], results[method, "numpy"]
+        print(f"{method}: python {python_time * 1000 / len(instances):.3f} ms, "
+              f"numpy {numpy_time * 1000 / len(instances):.3f} ms per instance, "
+              f"speedup {python_time / numpy_time:.2f}x"
+              f"{' (CHOICES DIFFER)' if method in mismatches else ''}")
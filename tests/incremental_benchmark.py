@@ -0,0 +1,61 @@
+import os
+import time
+import random
+import argparse
+from solver.parser import parse_dimacs_cnf
+from solver.solver import solve, Solver
+
+
+def make_queries(num_vars, count, size, seed=0):
+    """Return `count` random assumption lists of `size` literals over distinct variables."""
+    rng = random.Random(seed)
+    return [[v if rng.random() < 0.5 else -v for v in rng.sample(range(1, num_vars + 1), size)]
+            for _ in range(count)]
+
+
+def benchmark_queries(clauses, queries):
+    """
+    Answer every query with repeated `solve` calls and with one incremental
+    `Solver`. Returns the seconds each took and whether their answers agree.
+    """
+    start_time = time.perf_counter()
+    fresh = [solve(clauses + [[l] for l in assumptions], method="cdcl")[0] for assumptions in queries]
+    fresh_time = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    solver = Solver(clauses)
+    incremental = [solver.solve(assumptions) for assumptions in queries]
+    incremental_time = time.perf_counter() - start_time
+    return fresh_time, incremental_time, fresh == incremental
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare repeated solve() calls with an incremental Solver.")
+    parser.add_argument("paths", nargs="+", help="CNF files or folders containing CNF files.")
+    parser.add_argument("--queries", type=int, default=200, help="Assumption queries per instance.")
+    parser.add_argument("--size", type=int, default=3, help="Assumption literals per query.")
+    args = parser.parse_args()
+
+    files = []
+    for path in args.paths:
+        if os.path.isdir(path):
+            files.extend(os.path.join(path, f) for f in sorted(os.listdir(path)) if ".cnf" in f)
+        else:
+            files.append(path)
+
+    total_fresh = total_incremental = 0
+    for file_path in files:
+        num_vars, _, clauses = parse_dimacs_cnf(file_path)
+        clauses = [list(clause) for clause in clauses]
+        queries = make_queries(num_vars, args.queries, min(args.size, num_vars))
+        fresh_time, incremental_time, agree = benchmark_queries(clauses, queries)
+        total_fresh += fresh_time
+        total_incremental += incremental_time
+        print(f"{os.path.basename(file_path)}: solve() {fresh_time / len(queries) * 1000:.3f} ms/query, "
+              f"Solver {incremental_time / len(queries) * 1000:.3f} ms/query"
+              f"{'' if agree else ' (ANSWERS DIFFER)'}")
+    queries = args.queries * len(files)
+    if queries:
+        print(f"Total: solve() {total_fresh / queries * 1000:.3f} ms/query, "
+              f"Solver {total_incremental / queries * 1000:.3f} ms/query, "
+              f"speedup {total_fresh / total_incremental:.1f}x")
@@ -0,0 +1,72 @@
+import os
+import time
+import argparse
+from solver.parser import parse_dimacs_cnf
+
+
+def parse_dimacs_cnf_by_line(file_path):
+    """Line-by-line parser the token-stream parser replaced, kept as the baseline."""
+    num_vars = 0
+    num_clauses = 0
+    clauses = []
+
+    with open(file_path, 'r') as f:
+        for line in f:
+            line = line.strip()
+            if line.startswith('c') or line.startswith('%') or line.startswith('0'):
+                continue
+            if line.startswith('p'):
+                _, _, num_vars, num_clauses = line.split()
+                num_vars = int(num_vars)
+                num_clauses = int(num_clauses)
+                continue
+            try:
+                clause = set(map(int, line.split()))
+                if 0 in clause:
+                    clause.remove(0)
+                    clauses.append(clause)
+            except ValueError:
+                print(f"Warning: Invalid clause line format in file: {line}")
+    return num_vars, num_clauses, clauses
+
+
+PARSERS = {
+    "lines": parse_dimacs_cnf_by_line,
+    "stream": parse_dimacs_cnf,
+    "stream-compact": lambda file_path: parse_dimacs_cnf(file_path, compact=True),
+}
+
+
+def benchmark_parsers(files, parsers, repeat=3):
+    """Return the best of `repeat` runs, in seconds, for parsing all files with each parser."""
+    results = {}
+    for name in parsers:
+        parse = PARSERS[name]
+        best = float("inf")
+        for _ in range(repeat):
+            start_time = time.perf_counter()
+            for file_path in files:
+                parse(file_path)
+            best = min(best, time.perf_counter() - start_time)
+        results[name] = best
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark DIMACS parsing throughput.")
+    parser.add_argument("paths", nargs="+", help="CNF files or folders containing CNF files.")
+    parser.add_argument("--parsers", type=str, nargs="+", default=list(PARSERS), help="Parsers to compare.")
+    parser.add_argument("--repeat", type=int, default=3, help="Number of runs per parser.")
+    args = parser.parse_args()
+
+    files = []
+    for path in args.paths:
+        if os.path.isdir(path):
+            files.extend(os.path.join(path, f) for f in sorted(os.listdir(path)) if ".cnf" in f)
+        else:
+            files.append(path)
+    size = sum(os.path.getsize(f) for f in files)
+
+    results = benchmark_parsers(files, args.parsers, repeat=args.repeat)
+    for name, elapsed in results.items():
+        print(f"{name}: {elapsed:.4f} seconds, {size / elapsed / 2 ** 20:.2f} MiB/s")
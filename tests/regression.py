@@ -0,0 +1,211 @@
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import tempfile
+from datetime import datetime, timezone
+from solver.parser import parse_dimacs_cnf
+from solver.propagation import WatchedPropagator
+from solver.solver import solve, SOLVING_METHODS
+from tests.generate_tests import make_instance, write_dimacs_file
+
+BASELINE = os.path.join("tests", "baselines", "regression.json")
+
+# Case -> (family, generator parameters, instances); instance i is always generated with SEED and index i
+CASES = {
+    "ksat3-75": ("ksat", dict(num_vars=75, k=3), 8),
+    "flat-100": ("flat", dict(vertices=100), 6),
+    "pigeonhole-7": ("pigeonhole", dict(holes=7), 1),
+}
+# One large instance for the parse and propagation throughput
+LARGE = ("ksat", dict(num_vars=20000, k=3))
+ENGINES = ["JW", "MOMS", "VSIDS", "cdcl", "walksat"]
+# Local search cannot prove UNSAT, so it only runs on satisfiable families
+SATISFIABLE_ONLY = ("walksat", "probsat")
+SEED = 0
+# The propagation benchmark stops after this many conflicts
+MAX_CONFLICTS = 1000
+
+
+def timed_parse(path, compact):
+    start_time = time.perf_counter()
+    _, _, clauses = parse_dimacs_cnf(path, compact=compact, cache=False)
+    return len(clauses), time.perf_counter() - start_time, {}
+
+
+def timed_propagation(clauses, num_vars, seed):
+    """
+    Decide variables in a seeded random order and phase, propagating after
+    each decision and undoing the last decision on a conflict, until
+    MAX_CONFLICTS conflicts. Returns the number of assignments, the seconds
+    spent, and the conflicts.
+    """
+    rng = random.Random(seed)
+    order = list(range(1, num_vars + 1))
+    rng.shuffle(order)
+    phases = [rng.random() < 0.5 for _ in order]
+    propagator = WatchedPropagator(clauses, num_vars)
+    assignments = conflicts = 0
+    start_time = time.perf_counter()
+    for var, phase in zip(order, phases):
+        if propagator.values[var]:
+            continue
+        trail_size = len(propagator.trail)
+        propagator.new_level()
+        propagator.assign(var if phase else -var)
+        conflict = propagator.propagate()
+        assignments += len(propagator.trail) - trail_size
+        if conflict is not None:
+            conflicts += 1
+            if conflicts == MAX_CONFLICTS:
+                break
+            propagator.backtrack(propagator.decision_level - 1)
+    return assignments, time.perf_counter() - start_time, {"conflicts": conflicts}
+
+
+def timed_solves(instances, engine, seed):
+    """
+    Solve every instance with `engine`. Returns the instances, the seconds,
+    the answers, and the decisions and flips summed over the instances.
+    """
+    answers = []
+    effort = {"decisions": 0, "flips": 0}
+    start_time = time.perf_counter()
+    for clauses in instances:
+        stats = {}
+        if engine in ("dp", "resolution"):
+            result = solve(clauses, engine, stats=stats)
+        elif engine in SOLVING_METHODS:
+            result, _ = solve(clauses, engine, stats=stats, seed=seed)
+        else:
+            result, _ = solve(clauses, branching_method=engine, stats=stats)
+        answers.append("SAT" if result else "UNSAT" if result is False else "UNKNOWN")
+        for key in effort:
+            effort[key] += stats.get(key, 0)
+    return len(instances), time.perf_counter() - start_time, dict(answers=answers, **effort)
+
+
+def best_of(repeat, run, *args):
+    """Run a timed benchmark `repeat` times; returns the work, the best seconds and the details of the last run."""
+    runs = [run(*args) for _ in range(repeat)]
+    work, _, details = runs[-1]
+    return work, min(seconds for _, seconds, _ in runs), details
+
+
+def run_suite(engines=ENGINES, cases=CASES, repeat=3, only=None):
+    """
+    Time the parser, the propagation engine and every engine on every case.
+    Returns {benchmark name: record} where a record holds the throughput
+    (work per second), its unit, the best seconds and deterministic details
+    such as the answers and decisions.
+    """
+    selected = lambda name: not only or any(pattern in name for pattern in only)
+    results = {}
+
+    def record(name, unit, work, seconds, details):
+        results[name] = dict(throughput=work / seconds if seconds else float("inf"), unit=unit,
+                             work=work, seconds=seconds, **details)
+        print(f"{name}: {results[name]['throughput']:.1f} {unit} ({seconds:.3f}s)")
+
+    family, params = LARGE
+    num_vars, clauses = make_instance(family, SEED, 0, **params)
+    if selected("parse"):
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, "large.cnf")
+            write_dimacs_file(path, num_vars, clauses)
+            for compact in (False, True):
+                record(f"parse/{'compact' if compact else 'lists'}", "clauses/s",
+                       *best_of(repeat, timed_parse, path, compact))
+    if selected("propagate"):
+        record("propagate", "assignments/s", *best_of(repeat, timed_propagation, clauses, num_vars, SEED))
+
+    for case, (family, params, count) in cases.items():
+        instances = [make_instance(family, SEED, i, **params)[1] for i in range(count)]
+        for engine in engines:
+            name = f"solve/{case}/{engine}"
+            if not selected(name) or (engine in SATISFIABLE_ONLY and family != "flat"):
+                continue
+            record(name, "instances/s", *best_of(repeat, timed_solves, instances, engine, SEED))
+    return results
+
+
+def compare(results, baseline, threshold):
+    """
+    Print every benchmark next to its baseline and return the failures:
+    throughput below (1 - threshold) times the baseline, or different
+    answers on the same instances.
+    """
+    failures = []
+    for name, current in results.items():
+        base = baseline["benchmarks"].get(name)
+        if base is None:
+            print(f"{name}: no baseline")
+            continue
+        ratio = current["throughput"] / base["throughput"] if base["throughput"] else float("inf")
+        slow = ratio < 1 - threshold
+        print(f"{name}: {current['throughput']:.1f} vs {base['throughput']:.1f} {current['unit']} "
+              f"({ratio:.2f}x){' REGRESSION' if slow else ''}")
+        if slow:
+            failures.append(f"{name} runs at {ratio:.2f}x of the baseline throughput")
+        if "answers" in base and current.get("answers") != base["answers"]:
+            failures.append(f"{name} answers {current.get('answers')} instead of {base['answers']}")
+        for key in ("decisions", "flips"):
+            if current.get(key) != base.get(key):
+                print(f"  {key} changed: {base.get(key)} -> {current.get(key)}")
+    return failures
+
+
+def save_baseline(results, path, threshold):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    baseline = {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": f"{platform.system()} {platform.machine()}",
+        "threshold": threshold,
+        "benchmarks": results,
+    }
+    with open(path, "w") as f:
+        json.dump(baseline, f, indent=2)
+        f.write("\n")
+    print(f"Saved baseline to {path}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time parsing, propagation and full solves on fixed seeded "
+                                                 "instances and compare the throughput with a stored baseline.")
+    parser.add_argument("--baseline", type=str, default=BASELINE, help="Baseline JSON file.")
+    parser.add_argument("--save", action="store_true", help="Write the results as the new baseline instead of comparing.")
+    parser.add_argument("--output", type=str, default=None, help="Also write the results to this JSON file.")
+    parser.add_argument("--threshold", type=float, default=None,
+                        help="Allowed throughput drop as a fraction (default: the baseline's, or 0.25).")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per benchmark; the fastest one counts.")
+    parser.add_argument("--engines", type=str, nargs="+", default=ENGINES, help="Methods and DPLL heuristics to time.")
+    parser.add_argument("--only", type=str, nargs="+", default=None, help="Run only benchmarks whose name contains one of these.")
+    args = parser.parse_args()
+
+    results = run_suite(args.engines, repeat=args.repeat, only=args.only)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.save:
+        save_baseline(results, args.baseline, 0.25 if args.threshold is None else args.threshold)
+        sys.exit(0)
+    if not os.path.exists(args.baseline):
+        parser.error(f"No baseline at {args.baseline}; create one with --save")
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    threshold = baseline.get("threshold", 0.25) if args.threshold is None else args.threshold
+    if baseline.get("python") != platform.python_version():
+        print(f"Note: the baseline was recorded with Python {baseline.get('python')} on {baseline.get('machine')}")
+    print(f"\nComparison with {args.baseline} (threshold {threshold:.0%}):")
+    failures = compare(results, baseline, threshold)
+    if failures:
+        print(f"\n{len(failures)} regression(s):")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+    print("\nNo regressions")
@@ -0,0 +1,234 @@
+import os
+import re
+import csv
+import json
+import time
+import signal
+import argparse
+import multiprocessing
+from collections import deque
+from multiprocessing.connection import wait
+from solver.cache import InstanceCache
+from tests.test import solve_cnf_file
+
+try:
+    import resource
+except ImportError:  # Not available on Windows: no memory limit or peak RSS
+    resource = None
+
+FIELDS = ["folder", "file", "method", "status", "time", "splits", "peak_rss_kb",
+          "conflicts", "propagations", "decisions", "backtracks", "max_depth", "resolvents",
+          "propagation_time", "heuristic_time", "simplification_time", "resolution_time", "flips", "error", "count"]
+# Solver statistics copied into the records
+STATS_FIELDS = FIELDS[7:-2]
+
+
+def folder_name(folder_path):
+    return os.path.basename(os.path.normpath(folder_path))
+
+
+def make_jobs(folders, methods):
+    """Return an (instance, method) job for every CNF file of every folder and method."""
+    jobs = []
+    for folder in folders:
+        files = sorted(f for f in os.listdir(folder) if ".cnf" in f)
+        for method in methods:
+            jobs.extend((os.path.join(folder, f), method) for f in files)
+    return jobs
+
+
+def run_job(conn, file_path, method, memory_limit, cache_dir):
+    """
+    Solve one job in a child process and send its record through `conn`. The
+    job leads a process group of its own, so a timeout also kills the
+    portfolio and cube-and-conquer processes it starts.
+    """
+    if hasattr(os, "setsid"):
+        os.setsid()
+    if memory_limit and resource is not None:
+        limit = memory_limit * 2 ** 20
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    cache = InstanceCache(cache_dir) if cache_dir else False
+    record = {}
+    try:
+        elapsed_time, splits, result, stats = solve_cnf_file(file_path, method=method, cache=cache)
+        status = "UNKNOWN" if result is None else "SAT" if result else "UNSAT"
+        record.update(status=status, time=elapsed_time, splits=splits)
+        if method == "count":
+            record["count"] = result
+        record.update((key, stats[key]) for key in STATS_FIELDS if key in stats)
+    except MemoryError:
+        record.update(status="memout")
+    except Exception as e:
+        record.update(status="error", error=repr(e))
+    if resource is not None:
+        record["peak_rss_kb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    conn.send(record)
+    conn.close()
+
+
+def kill_job(process):
+    """Kill a job and every process in its process group."""
+    if hasattr(os, "killpg"):
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass  # Nothing left in the group
+    else:
+        process.kill()
+    process.join()
+
+
+def run_jobs(jobs, workers=None, timeout=None, memory_limit=None, cache_dir=None):
+    """
+    Run (file_path, method) jobs on `workers` processes and yield one record per job.
+
+    Every job gets its own process, so a job that exceeds `timeout` seconds of
+    wall-clock time can be killed without affecting the others. `memory_limit`
+    (MiB) caps each job's address space. Records are yielded as jobs finish.
+    """
+    workers = workers or os.cpu_count() or 1
+    context = multiprocessing.get_context()
+    pending = deque(jobs)
+    running = {}  # connection -> (process, file_path, method, start time)
+
+    def record(file_path, method, **fields):
+        base = {"folder": folder_name(os.path.dirname(file_path)),
+                "file": os.path.basename(file_path), "method": method}
+        base.update(fields)
+        return base
+
+    while pending or running:
+        while pending and len(running) < workers:
+            file_path, method = pending.popleft()
+            receiver, sender = context.Pipe(duplex=False)
+            process = context.Process(target=run_job, args=(sender, file_path, method, memory_limit, cache_dir))
+            process.start()
+            sender.close()
+            running[receiver] = (process, file_path, method, time.perf_counter())
+
+        deadline = None
+        if timeout is not None:
+            deadline = min(start for _, _, _, start in running.values()) + timeout
+        ready = wait(list(running), None if deadline is None else max(0, deadline - time.perf_counter()))
+        for conn in ready:
+            process, file_path, method, _ = running.pop(conn)
+            try:
+                fields = conn.recv()
+            except EOFError:
+                # Killed before reporting, e.g. by the OOM killer
+                fields = {"status": "crashed"}
+            conn.close()
+            process.join()
+            yield record(file_path, method, **fields)
+
+        if timeout is not None:
+            now = time.perf_counter()
+            for conn, (process, file_path, method, start) in list(running.items()):
+                if now - start >= timeout:
+                    kill_job(process)
+                    conn.close()
+                    del running[conn]
+                    yield record(file_path, method, status="timeout", time=now - start)
+
+
+def write_results(records, path):
+    """Write records to a .csv file, or to a JSON Lines file for any other suffix."""
+    with open(path, "w", newline="") as f:
+        if path.endswith(".csv"):
+            writer = csv.DictWriter(f, fieldnames=FIELDS)
+            writer.writeheader()
+            writer.writerows(records)
+        else:
+            for r in records:
+                f.write(json.dumps(r) + "\n")
+    print(f"Saved results to {path}")
+
+
+def load_text_results(path):
+    """
+    Read a `*_benchmark_results.txt` file written by tests/test.py.
+    Returns {(folder, method): {"time": ..., "splits": ..., ...}}.
+    """
+    results = {}
+    folder = None
+    entry = None
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if line.startswith("Benchmark Results for folder:"):
+                folder = folder_name(line.split(":", 1)[1].strip())
+            elif line.startswith("Method:"):
+                entry = results.setdefault((folder, line.split(":", 1)[1].strip()), {})
+            elif entry is not None and ":" in line:
+                key, value = (part.strip() for part in line.split(":", 1))
+                if key in ("Failed Files", "Unknown Files"):
+                    entry[key.lower().replace(" ", "_")] = [] if value == "None" else value.split(", ")
+                    continue
+                match = re.match(r"[-+.\deE]+", value)
+                if match:
+                    key = key.lower().replace("average ", "").replace(" usage", "").replace(" ", "_")
+                    entry[key] = float(match.group())
+    return results
+
+
+def load_baseline(path):
+    """Load one results text file or every `*_benchmark_results.txt` file of a folder."""
+    if not os.path.isdir(path):
+        return load_text_results(path)
+    baseline = {}
+    for name in sorted(os.listdir(path)):
+        if name.endswith("_benchmark_results.txt"):
+            baseline.update(load_text_results(os.path.join(path, name)))
+    return baseline
+
+
+def summarize(records, baseline=None):
+    """Print per (folder, method) counts and averages, with ratios to the baseline."""
+    groups = {}
+    for r in records:
+        groups.setdefault((r["folder"], r["method"]), []).append(r)
+    for (folder, method), group in sorted(groups.items()):
+        solved = [r for r in group if r["status"] in ("SAT", "UNSAT")]
+        statuses = {}
+        for r in group:
+            statuses[r["status"]] = statuses.get(r["status"], 0) + 1
+        print(f"\n{folder} / {method}: " + ", ".join(f"{n} {s}" for s, n in sorted(statuses.items())))
+        if not solved:
+            continue
+        avg_time = sum(r["time"] for r in solved) / len(solved)
+        avg_splits = sum(r["splits"] for r in solved) / len(solved)
+        peak = max((r.get("peak_rss_kb") or 0) for r in group)
+        print(f"  Average time: {avg_time:.4f} seconds")
+        print(f"  Average splits: {avg_splits}")
+        print(f"  Peak RSS: {peak} KB")
+        base = (baseline or {}).get((folder, method))
+        if base and base.get("time"):
+            print(f"  Baseline time: {base['time']:.4f} seconds ({avg_time / base['time']:.2f}x)")
+        if base and base.get("splits"):
+            print(f"  Baseline splits: {base['splits']} ({avg_splits / base['splits']:.2f}x)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the benchmark in parallel with per-instance limits.")
+    parser.add_argument("--folders", type=str, nargs="+", default=["tests/uf20-91"], help="Folders containing CNF files.")
+    parser.add_argument("--methods", type=str, nargs="+", default=["first", "MAXO", "MOMS", "MAMS", "JW", "GUP", "SUP"], help="List of methods to test.")
+    parser.add_argument("--workers", type=int, default=None, help="Number of parallel jobs (default: all cores).")
+    parser.add_argument("--timeout", type=float, default=None, help="Wall-clock limit per instance in seconds.")
+    parser.add_argument("--memory-limit", type=int, default=None, help="Address-space limit per instance in MiB.")
+    parser.add_argument("--output", type=str, default="benchmark_results.jsonl", help="Results file (.jsonl or .csv).")
+    parser.add_argument("--baseline", type=str, default=None, help="Results text file or folder to compare against, e.g. tests/test_results.")
+    parser.add_argument("--cache-dir", type=str, default=".cnf_cache", help="Directory of the parsed-instance cache.")
+    parser.add_argument("--no-cache", action="store_true", help="Parse every file in every job.")
+    args = parser.parse_args()
+
+    jobs = make_jobs(args.folders, args.methods)
+    cache_dir = None if args.no_cache else args.cache_dir
+    records = []
+    for r in run_jobs(jobs, workers=args.workers, timeout=args.timeout,
+                      memory_limit=args.memory_limit, cache_dir=cache_dir):
+        records.append(r)
+        print(f"[{len(records)}/{len(jobs)}] {r['file']} with {r['method']}: {r['status']}")
+
+    write_results(records, args.output)
+    summarize(records, load_baseline(args.baseline) if args.baseline else None)
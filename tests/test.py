@@ -2,48 +2,70 @@ import os
 import time
 import argparse
 import gc
-from solver.solver import solve
-from solver.parser import parse_dimacs_cnf, convert_clauses_to_solver_format
-
-
-def solve_cnf_file(file_path, method="first", verbose=False):
-    """Solve a single CNF file and measure time and memory."""
-    num_vars, num_clauses, clauses = parse_dimacs_cnf(file_path)
+from solver.solver import solve, SOLVING_METHODS
+from solver.parser import parse_dimacs_cnf, convert_clauses_to_solver_format, is_cardinality_cnf, parse_cardinality_cnf
+from solver.cache import InstanceCache
+
+
+def solve_cnf_file(file_path, method="first", verbose=False, cache=None):
+    """
+    Solve a single CNF file and measure time and memory. With method "count"
+    the result is the number of models over the variables of the header.
+    """
+    # "cnf+" files also contain cardinality constraints
+    constraints = []
+    if is_cardinality_cnf(file_path):
+        num_vars, num_clauses, clauses, constraints = parse_cardinality_cnf(file_path)
+    else:
+        num_vars, num_clauses, clauses = parse_dimacs_cnf(file_path, compact=True, cache=cache)
     solver_clauses = convert_clauses_to_solver_format(clauses)
 
     start_time = time.perf_counter()
     splits = [0]
     result = [False]
+    stats = {}
     def run_solver():
-        if method == "resolution":
-            result[0] = solve(solver_clauses, method, verbose=verbose)
-        elif method == "dp":
-            result[0] = solve(solver_clauses, method, verbose=verbose)
+        if method in ("resolution", "dp"):
+            result[0] = solve(solver_clauses, method, verbose=verbose, stats=stats, cardinality=constraints)
+        elif method == "count":
+            result[0], splits[0] = solve(solver_clauses, method, verbose=verbose, stats=stats, num_vars=num_vars,
+                                         cardinality=constraints)
+        elif method in SOLVING_METHODS:
+            result[0], splits[0] = solve(solver_clauses, method, verbose=verbose, stats=stats, cardinality=constraints)
         else:
-            result[0], splits[0] = solve(solver_clauses, branching_method=method, verbose=verbose)
+            result[0], splits[0] = solve(solver_clauses, branching_method=method, verbose=verbose, stats=stats,
+                                         cardinality=constraints)
         return
 
     run_solver()
     end_time = time.perf_counter()
     elapsed_time = end_time - start_time
-    return elapsed_time, splits[0], result[0]
+    return elapsed_time, splits[0], result[0], stats
 
-def test_folder(folder_path, method="first"):
+def test_folder(folder_path, method="first", cache=None):
     times = []
     splits_data = []
+    stats_data = {}
     satisfiable = True
     failed_files = []
+    unknown_files = []
 
     files = sorted(f for f in os.listdir(folder_path) if f.endswith(".cnf"))
 
     for file_name in files:
         print(f"Testing {file_name} with method {method}")
         file_path = os.path.join(folder_path, file_name)
-        elapsed_time, splits, result = solve_cnf_file(file_path, method=method)
+        elapsed_time, splits, result, stats = solve_cnf_file(file_path, method=method, cache=cache)
         times.append(elapsed_time)
         splits_data.append(splits)
-
-        if not result:
+        for key in ("conflicts", "propagations"):
+            if key in stats:
+                stats_data.setdefault(key, []).append(stats[key])
+
+        if result is None:
+            # Local search gave up: neither a model nor a proof of UNSAT
+            unknown_files.append(file_name)
+        elif not result:
             satisfiable = False
             failed_files.append(file_name)
 
@@ -51,22 +73,30 @@ def test_folder(folder_path, method="first"):
 
     avg_time = sum(times) / len(times) if times else 0
     avg_splits = sum(splits_data) / len(splits_data) if splits_data else 0
-    return satisfiable, avg_time, avg_splits, failed_files
+    avg_stats = {key: sum(values) / len(values) for key, values in stats_data.items()}
+    return satisfiable, avg_time, avg_splits, failed_files, unknown_files, avg_stats
 
-def benchmark_methods(folder_path, methods):
+def benchmark_methods(folder_path, methods, cache=None):
     results = {}
     for method in methods:
         print(f"\nTesting method: {method}")
-        satisfiable, avg_time, avg_splits, failed_files = test_folder(folder_path, method=method)
-        print(f"Status: {"OK" if satisfiable else "FAILED"}")
+        satisfiable, avg_time, avg_splits, failed_files, unknown_files, avg_stats = test_folder(
+            folder_path, method=method, cache=cache)
+        print(f"Status: {'FAILED' if not satisfiable else 'UNKNOWN' if unknown_files else 'OK'}")
         print(f"Average time for {method}: {avg_time:.4f} seconds")
         print(f"Average splits for {method}: {avg_splits}")
+        for key, value in avg_stats.items():
+            print(f"Average {key} for {method}: {value}")
         if failed_files:
             print(f"Files failed for {method}: {failed_files}")
+        if unknown_files:
+            print(f"Files without an answer for {method}: {unknown_files}")
         results[method] = {
             "time": avg_time,
             "splits": avg_splits,
-            "failed_files": failed_files
+            "failed_files": failed_files,
+            "unknown_files": unknown_files,
+            "stats": avg_stats
         }
     return results
 
@@ -81,10 +111,14 @@ def save_results_to_file(results, folder_path, filename="benchmark_results.txt")
             f.write(f"Method: {method}\n")
             f.write(f"  Average Time: {data['time']:.4f} seconds\n")
             f.write(f"  Average Splits: {data['splits']}\n")
+            for key, value in data['stats'].items():
+                f.write(f"  Average {key.capitalize()}: {value}\n")
             if data['failed_files']:
                 f.write(f"  Failed Files: {', '.join(data['failed_files'])}\n")
             else:
                 f.write("  Failed Files: None\n")
+            if data['unknown_files']:
+                f.write(f"  Unknown Files: {', '.join(data['unknown_files'])}\n")
             f.write("\n")
     print(f"Saved benchmark results to {full_path}")
 
@@ -93,9 +127,14 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Benchmark DPLL solver with memory profiling.")
     parser.add_argument("--folder", type=str, default="tests/uf20-91", help="Folder containing CNF files.")
     parser.add_argument("--methods", type=str, nargs="+", default=["first", "MAXO", "MOMS", "MAMS", "JW", "GUP", "SUP"], help="List of methods to test.")
+    parser.add_argument("--cache-dir", type=str, default=".cnf_cache", help="Directory of the parsed-instance cache.")
+    parser.add_argument("--no-cache", action="store_true", help="Parse every file on every run.")
     args = parser.parse_args()
 
+    # Parsed instances are reused across methods and runs
+    cache = False if args.no_cache else InstanceCache(args.cache_dir)
+
     # Run benchmark
-    results = benchmark_methods(args.folder, methods=args.methods)
+    results = benchmark_methods(args.folder, methods=args.methods, cache=cache)
 
     save_results_to_file(results, args.folder)
\ No newline at end of file